@@ -3,22 +3,45 @@ REST API server for the document search backend.
 Provides endpoints for document processing, search, and Readwise integration.
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, BackgroundTasks
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse, FileResponse, HTMLResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse, FileResponse, HTMLResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional, Dict, Any
 import asyncio
 import logging
+import gzip
+import io
 import tempfile
 import os
+import shutil
 from pathlib import Path
 import uuid
+from collections import deque
+from enum import Enum
 import json
 import time
+import orjson
 
+try:
+    from brotli_asgi import BrotliMiddleware
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+from config import Config
 from main import DocumentSearchBackend
+from auto_indexer import AutoIndexer
+from background_processor import BackgroundProcessor
+from citation_manager import CitationManager
+from document_processor import DocumentProcessor
+from folder_manager import FolderManager
+from task_store import TASK_TTL_SECONDS, TERMINAL_STATUSES, InMemoryTaskStore, create_task_store, encode_update
+from executors import io_executor, run_io, shutdown_executors
+from file_scan import walk_supported_files
+from response_cache import TTLCache, make_etag, etag_matches
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -28,26 +51,95 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Local Document Search API",
     description="Privacy-first semantic search for documents and Readwise highlights",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
-# Add CORS middleware
+# Clients are the Electron windows (file:// pages send Origin "null"), the
+# bundled web page and local dev servers. Override with server.cors_origins.
+DEFAULT_CORS_ORIGINS = [
+    "null",
+    "http://localhost:3000",
+    "http://127.0.0.1:3000",
+    "http://localhost:8000",
+    "http://127.0.0.1:8000",
+]
+
+# Add CORS middleware; an explicit allowlist lets browsers cache preflights for a day
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure this for production
+    allow_origins=Config().get('server.cors_origins', DEFAULT_CORS_ORIGINS),
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=["Content-Type", "Cache-Control", "If-None-Match", "Last-Event-ID"],
+    max_age=86400,
 )
 
+def skips_compression(scope) -> bool:
+    """Server-Sent Event streams must flush per event and the index page is
+    served precompressed, so neither goes through compression middleware."""
+    return scope["type"] == "http" and (scope["path"] == "/" or scope["path"].endswith("/stream"))
+
+class StreamSafeGZipMiddleware(GZipMiddleware):
+    """GZip responses except those excluded by skips_compression()."""
+
+    async def __call__(self, scope, receive, send):
+        if skips_compression(scope):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Compress large JSON responses (search results, task summaries, annotations, folder scans)
+if BROTLI_AVAILABLE:
+    class StreamSafeBrotliMiddleware(BrotliMiddleware):
+        """Brotli, falling back to gzip, except responses excluded by skips_compression()."""
+
+        async def __call__(self, scope, receive, send):
+            if skips_compression(scope):
+                await self.app(scope, receive, send)
+                return
+            await super().__call__(scope, receive, send)
+
+    app.add_middleware(StreamSafeBrotliMiddleware, quality=4, minimum_size=1024, gzip_fallback=True)
+else:
+    app.add_middleware(StreamSafeGZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Global backend instance
 backend: Optional[DocumentSearchBackend] = None
 
+def require_backend() -> DocumentSearchBackend:
+    """Dependency that rejects requests until the backend has started."""
+    if backend is None:
+        raise HTTPException(status_code=503, detail="Backend not initialized")
+    return backend
+
+def require_component(attr: str, label: str):
+    """Build a dependency that returns a backend component, or rejects with 503 while it is missing."""
+    detail = f"{label} not available"
+
+    def dependency():
+        component = getattr(backend, attr, None)
+        if component is None:
+            # A fresh exception each time; re-raising a shared instance would keep
+            # growing its __traceback__ and pin every rejected request's frames
+            raise HTTPException(status_code=503, detail=detail)
+        return component
+
+    return dependency
+
+require_citation_manager = require_component('citation_manager', "Citation manager")
+require_background_processor = require_component('background_processor', "Background processor")
+require_document_processor = require_component('document_processor', "Document processor")
+require_auto_indexer = require_component('auto_indexer', "Auto-indexer")
+require_folder_manager = require_component('folder_manager', "Folder manager")
+
 # Mount static files for web interface
 app.mount("/static", StaticFiles(directory="web"), name="static")
 
 # Pydantic models for request/response
 class SearchRequest(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     query: str
     limit: Optional[int] = 20
     similarity_threshold: Optional[float] = 0.3
@@ -58,6 +150,18 @@ class SearchResponse(BaseModel):
     total_results: int
     processing_time_ms: float
 
+class SearchBatchRequest(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    queries: List[str]
+    limit: Optional[int] = 20
+    similarity_threshold: Optional[float] = 0.3
+
+class SearchBatchResponse(BaseModel):
+    results: List[SearchResponse]
+    total_queries: int
+    processing_time_ms: float
+
 class ReadwiseImportRequest(BaseModel):
     folder_path: str
 
@@ -76,6 +180,9 @@ class IndexingStatusRequest(BaseModel):
 class TriggerIndexingRequest(BaseModel):
     file_paths: List[str]
 
+class DeleteDocumentsRequest(BaseModel):
+    ids: List[str]
+
 class DocumentProcessingStatus(BaseModel):
     task_id: str
     status: str  # "processing", "completed", "error"
@@ -91,26 +198,188 @@ class StatsResponse(BaseModel):
     embedding_model: str
     embedding_dimension: int
 
-# In-memory task storage (use Redis in production)
-processing_tasks: Dict[str, DocumentProcessingStatus] = {}
-progress_subscribers: Dict[str, List] = {}  # task_id -> list of queues for SSE
+# Search micro-batching: concurrent /search calls are coalesced into one
+# embedding pass and vector store round-trip
+SEARCH_MAX_BATCH = 32
+SEARCH_BATCH_WINDOW = 0.005  # seconds to wait for more queries after the first
+search_queue: asyncio.Queue = asyncio.Queue()
+search_batcher_task: Optional[asyncio.Task] = None
+
+async def search_batcher():
+    """Drain queued searches in batches and resolve each caller's future."""
+    loop = asyncio.get_running_loop()
+
+    while True:
+        batch = [await search_queue.get()]
+        deadline = loop.time() + SEARCH_BATCH_WINDOW
+
+        # Collect more queries until the batch is full or the window closes
+        while len(batch) < SEARCH_MAX_BATCH:
+            try:
+                batch.append(search_queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(search_queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        queries, limits, thresholds, futures = zip(*batch)
+
+        try:
+            batch_results = await backend.search_batch(list(queries), list(limits), list(thresholds))
+            for future, results in zip(futures, batch_results):
+                if not future.done():
+                    future.set_result(results)
+        except Exception as e:
+            logger.error(f"Batched search error: {e}")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+
+# Response caches for repeated queries (keystroke-driven clients repeat a lot)
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+search_cache = TTLCache(maxsize=1024, ttl=60.0)
+suggestions_cache = TTLCache(maxsize=1024, ttl=60.0)
+SUGGESTIONS_CACHE_MAX_QUERY = 32  # characters; longer queries bypass the suggestions cache
+
+def invalidate_search_caches():
+    """Drop cached search results after the indexed content changes."""
+    search_cache.clear()
+    suggestions_cache.clear()
+    if backend and backend.vector_store:
+        backend.vector_store.semantic_cache.clear()
+
+def content_generation() -> int:
+    """Write generation of the vector store; part of every search cache key and ETag."""
+    if backend and backend.vector_store:
+        return backend.vector_store.write_generation
+    return 0
+
+def tagged_response(body: bytes, generation: int) -> tuple:
+    """Pair a response body with an ETag that changes whenever the indexed content does."""
+    return body, make_etag(body + b"\0%d" % generation)
+
+def cached_json_response(request: Request, cached: tuple) -> Response:
+    """Return a cached (body, etag) pair, or 304 if the client already has it."""
+    body, etag = cached
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+# Task storage: in-memory until startup, Redis when `tasks.redis_url` is configured
+task_store = InMemoryTaskStore()
+
+# Progress coalescing: latest pending progress per task and the task flushing it
+PROGRESS_FLUSH_INTERVAL = 0.1  # seconds (10 Hz)
+pending_progress: Dict[str, Dict[str, Any]] = {}
+progress_flushers: Dict[str, asyncio.Task] = {}
+
+# Janitor that drops finished tasks from the in-memory store
+TASK_GC_INTERVAL = 60.0  # seconds between sweeps
+task_gc_task: Optional[asyncio.Task] = None
+
+async def task_gc_loop():
+    """Periodically purge finished tasks older than the task TTL."""
+    while True:
+        await asyncio.sleep(TASK_GC_INTERVAL)
+        try:
+            purged = await task_store.purge_finished()
+            if purged:
+                logger.debug(f"Purged {purged} finished tasks")
+        except Exception as e:
+            logger.error(f"Task cleanup error: {e}")
+
+# Limit how many document processing jobs embed at once; the rest wait their turn
+PROCESS_SEM = asyncio.Semaphore(max(1, (os.cpu_count() or 1) // 2))
 
 async def notify_progress_subscribers(task_id: str, update: Dict[str, Any]):
     """Notify all SSE subscribers of a progress update."""
-    if task_id in progress_subscribers:
-        for queue in progress_subscribers[task_id]:
-            try:
-                await queue.put(update)
-            except Exception as e:
-                logger.error(f"Failed to notify subscriber: {e}")
+    await task_store.publish(task_id, update)
+
+async def create_processing_task(message: str) -> str:
+    """Register a new processing task and return its ID."""
+    task_id = str(uuid.uuid4())
+    await task_store.create(task_id, DocumentProcessingStatus(
+        task_id=task_id,
+        status="processing",
+        progress=0.0,
+        message=message
+    ).model_dump())
+    return task_id
+
+async def update_processing_task(task_id: str, **fields):
+    """Update a processing task and notify SSE subscribers."""
+    if fields.get("status") in ("completed", "error"):
+        # Terminal states go out immediately; drop any progress still waiting to be flushed
+        pending_progress.pop(task_id, None)
+        flusher = progress_flushers.pop(task_id, None)
+        if flusher is not None and flusher is not asyncio.current_task():
+            flusher.cancel()
+
+    task = await task_store.update(task_id, **fields)
+    if task is not None:
+        await notify_progress_subscribers(task_id, task)
+
+    if fields.get("status") == "completed":
+        invalidate_search_caches()
+
+async def flush_progress(task_id: str):
+    """Write the latest pending progress for a task at most every PROGRESS_FLUSH_INTERVAL."""
+    try:
+        while True:
+            await asyncio.sleep(PROGRESS_FLUSH_INTERVAL)
+            fields = pending_progress.pop(task_id, None)
+            if fields is None:
+                break
+            await update_processing_task(task_id, **fields)
+    finally:
+        if progress_flushers.get(task_id) is asyncio.current_task():
+            del progress_flushers[task_id]
+
+def make_progress_callback(task_id: str):
+    """Create a progress callback that records progress for a task.
+
+    Updates are coalesced: repeated reports are dropped and only the latest
+    progress is stored and published, at most every PROGRESS_FLUSH_INTERVAL
+    seconds.
+    """
+    last_update = {}
+
+    async def progress_callback(progress: float, message: str):
+        update = {"progress": progress, "message": message}
+        if update == last_update:
+            return  # nothing changed since the last report
+        last_update.clear()
+        last_update.update(update)
+
+        pending_progress[task_id] = update
+        if task_id not in progress_flushers:
+            progress_flushers[task_id] = asyncio.create_task(flush_progress(task_id))
+    return progress_callback
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize the backend on startup."""
-    global backend
+    global backend, search_batcher_task, task_gc_task, task_store, index_html
     try:
+        # asyncio.to_thread() offloads (uploads, folder scans) share the I/O pool
+        asyncio.get_running_loop().set_default_executor(io_executor)
+
         backend = DocumentSearchBackend()
         await backend.initialize()
+        task_store = create_task_store(
+            backend.config.get('tasks.redis_url'),
+            backend.config.get('tasks.ttl_seconds', TASK_TTL_SECONDS)
+        )
+        search_batcher_task = asyncio.create_task(search_batcher())
+        task_gc_task = asyncio.create_task(task_gc_loop())
+        index_html = await asyncio.to_thread(load_index_html)
         logger.info("API server started successfully")
     except Exception as e:
         logger.error(f"Failed to initialize backend: {e}")
@@ -120,24 +389,17 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown."""
     global backend
+    if search_batcher_task:
+        search_batcher_task.cancel()
+    if task_gc_task:
+        task_gc_task.cancel()
+    await task_store.close()
     if backend:
         await backend.cleanup()
         logger.info("API server shutdown complete")
+    shutdown_executors()
 
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    """Serve the main web interface."""
-    try:
-        # Try to serve the comprehensive React app first
-        with open("web/app.html", "r", encoding="utf-8") as f:
-            return HTMLResponse(content=f.read())
-    except FileNotFoundError:
-        try:
-            # Fallback to basic interface
-            with open("web/index.html", "r", encoding="utf-8") as f:
-                return HTMLResponse(content=f.read())
-        except FileNotFoundError:
-            return HTMLResponse(content="""
+FALLBACK_INDEX_HTML = """
             <!DOCTYPE html>
             <html>
             <head><title>Semantic Search Assistant</title></head>
@@ -149,7 +411,35 @@ async def root():
                 <p>❤️ Health Check: <a href="/health">/health</a></p>
             </body>
             </html>
-            """)
+            """
+
+# Main web page, read and gzipped once at startup: (raw, gzipped)
+index_html: Optional[tuple] = None
+
+def load_index_html() -> tuple:
+    """Read the web interface page and precompress it (blocking, run in a thread)."""
+    # Try to serve the comprehensive React app first, then the basic interface
+    body = FALLBACK_INDEX_HTML.encode("utf-8")
+    for page in ("web/app.html", "web/index.html"):
+        try:
+            body = Path(page).read_bytes()
+            break
+        except FileNotFoundError:
+            continue
+    return body, gzip.compress(body, compresslevel=6)
+
+@app.get("/", response_class=HTMLResponse)
+async def root(request: Request):
+    """Serve the main web interface."""
+    global index_html
+    if index_html is None:
+        index_html = await asyncio.to_thread(load_index_html)
+
+    body, gzipped = index_html
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(content=gzipped, media_type="text/html",
+                        headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+    return Response(content=body, media_type="text/html")
 
 @app.get("/api")
 async def api_status():
@@ -162,7 +452,7 @@ async def health_check():
     try:
         stats = await backend.get_stats()
         folder_manager_status = "not_available"
-        if hasattr(backend, 'folder_manager'):
+        if backend.folder_manager is not None:
             folder_manager_status = {
                 "connected_folders": backend.folder_manager.get_connected_folders(),
                 "is_monitoring": backend.folder_manager.is_monitoring,
@@ -191,79 +481,107 @@ async def get_system_status():
         logger.error(f"Error getting system status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/search", response_model=SearchResponse)
-async def search_documents(request: SearchRequest):
+@app.post("/search", response_model=SearchResponse, dependencies=[Depends(require_backend)])
+async def search_documents(request: SearchRequest, http_request: Request):
     """Search across all indexed documents and highlights."""
-    if not backend:
-        raise HTTPException(status_code=500, detail="Backend not initialized")
     
     try:
-        import time
-        start_time = time.time()
+        generation = content_generation()
+        cache_key = (generation, request.query, request.limit, round(request.similarity_threshold, 3))
+        cached = search_cache.get(cache_key)
+        if cached is not None:
+            return cached_json_response(http_request, cached)
+
+        start_time = time.perf_counter()
         
-        results = await backend.search(
-            query=request.query,
-            limit=request.limit,
-            similarity_threshold=request.similarity_threshold
-        )
+        # Queue the query for the micro-batcher and wait for its slice of results
+        future = asyncio.get_running_loop().create_future()
+        await search_queue.put((request.query, request.limit, request.similarity_threshold, future))
+        results = await future
         
-        processing_time = (time.time() - start_time) * 1000
+        processing_time = (time.perf_counter() - start_time) * 1000
         
-        return SearchResponse(
-            query=request.query,
-            results=results,
-            total_results=len(results),
-            processing_time_ms=round(processing_time, 2)
-        )
+        # Build the payload directly; validating every result through the
+        # response model costs more than the serialization itself
+        body = orjson.dumps({
+            "query": request.query,
+            "results": results,
+            "total_results": len(results),
+            "processing_time_ms": round(processing_time, 2)
+        }, option=ORJSON_OPTIONS)
+
+        cached = tagged_response(body, generation)
+        search_cache.set(cache_key, cached)
+        return cached_json_response(http_request, cached)
     
     except Exception as e:
         logger.error(f"Search error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/documents/upload")
+@app.post("/search/batch", response_model=SearchBatchResponse, dependencies=[Depends(require_backend)])
+async def search_documents_batch(request: SearchBatchRequest):
+    """Search for several queries in a single embedding and vector store pass."""
+
+    try:
+        start_time = time.perf_counter()
+
+        count = len(request.queries)
+        batch_results = await backend.search_batch(
+            request.queries,
+            [request.limit] * count,
+            [request.similarity_threshold] * count
+        )
+
+        processing_time = (time.perf_counter() - start_time) * 1000
+
+        return ORJSONResponse(content={
+            "results": [
+                {
+                    "query": query,
+                    "results": results,
+                    "total_results": len(results),
+                    "processing_time_ms": round(processing_time, 2)
+                }
+                for query, results in zip(request.queries, batch_results)
+            ],
+            "total_queries": count,
+            "processing_time_ms": round(processing_time, 2)
+        })
+
+    except Exception as e:
+        logger.error(f"Batch search error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/documents/upload", dependencies=[Depends(require_backend)])
 async def upload_documents(
     background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...)
 ):
     """Upload and process multiple documents."""
-    if not backend:
-        raise HTTPException(status_code=500, detail="Backend not initialized")
     
-    # Generate task ID
-    task_id = str(uuid.uuid4())
+    # Spool uploads to disk now: the UploadFile objects are closed once the
+    # response is sent, and the job may wait for a processing slot
+    temp_files = []
+    for file in files:
+        temp_files.append(await asyncio.to_thread(save_upload_to_temp_file, file))
     
-    # Initialize task status
-    processing_tasks[task_id] = DocumentProcessingStatus(
-        task_id=task_id,
-        status="processing",
-        progress=0.0,
-        message="Starting document processing..."
-    )
+    # Create task
+    task_id = await create_processing_task("Starting document processing...")
     
     # Start background processing
-    background_tasks.add_task(process_documents_background, task_id, files)
+    background_tasks.add_task(process_documents_background, task_id, temp_files)
     
     return {"task_id": task_id, "message": "Document processing started"}
 
-@app.post("/process")
+@app.post("/process", dependencies=[Depends(require_backend)])
 async def process_documents_from_paths(
     background_tasks: BackgroundTasks,
     request: ProcessDocumentsRequest
 ):
     """Process documents from file paths."""
-    if not backend:
-        raise HTTPException(status_code=500, detail="Backend not initialized")
-
-    # Generate task ID
-    task_id = str(uuid.uuid4())
 
-    # Initialize task status
-    processing_tasks[task_id] = DocumentProcessingStatus(
-        task_id=task_id,
-        status="processing",
-        progress=0.0,
-        message="Starting document processing..."
-    )
+    # Create task
+    task_id = await create_processing_task("Starting document processing...")
 
     # Start background processing
     background_tasks.add_task(process_file_paths_background, task_id, request.file_paths)
@@ -272,134 +590,175 @@ async def process_documents_from_paths(
 
 async def process_file_paths_background(task_id: str, file_paths: List[str]):
     """Background task for processing documents from file paths."""
-    try:
-        # Update progress callback
-        async def progress_callback(progress: float, message: str):
-            if task_id in processing_tasks:
-                processing_tasks[task_id].progress = progress
-                processing_tasks[task_id].message = message
+    async with PROCESS_SEM:
+        try:
+            # Update progress callback
+            progress_callback = make_progress_callback(task_id)
 
-                # Notify SSE subscribers
-                await notify_progress_subscribers(task_id, processing_tasks[task_id].dict())
+            # Process documents
+            results = await backend.process_documents(file_paths, progress_callback)
 
-        # Process documents
-        results = await backend.process_documents(file_paths, progress_callback)
+            # Update final status
+            await update_processing_task(task_id, status="completed", progress=100.0,
+                                         message="Processing completed", results=results)
 
-        # Update final status
-        processing_tasks[task_id].status = "completed"
-        processing_tasks[task_id].progress = 100.0
-        processing_tasks[task_id].message = "Processing completed"
-        processing_tasks[task_id].results = results
+        except Exception as e:
+            logger.error(f"Document processing error: {e}")
+            await update_processing_task(task_id, status="error", message=str(e))
+
+UPLOAD_COPY_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+def upload_suffix(filename: Optional[str]) -> str:
+    """Temp file suffix for an upload: its extension if supported, else '.bin'.
+
+    The client-supplied name is never used verbatim, so the suffix stays short.
+    """
+    _, dot, extension = (filename or '').lower().rpartition('.')
+    suffix = '.' + extension
+    return suffix if dot and suffix in SUPPORTED_SCAN_EXTENSIONS else '.bin'
+
+def save_upload_to_temp_file(file: UploadFile) -> str:
+    """Copy an upload to a temp file in fixed-size chunks and return its path.
+
+    Runs in a worker thread so large uploads neither sit in memory whole nor
+    block the event loop.
+    """
+    with tempfile.NamedTemporaryFile(delete=False, suffix=upload_suffix(file.filename),
+                                     buffering=UPLOAD_COPY_CHUNK_SIZE) as temp_file:
+        # Hint the page cache that the file is written sequentially (Linux only)
+        if hasattr(os, 'posix_fadvise'):
+            try:
+                os.posix_fadvise(temp_file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
 
-    except Exception as e:
-        logger.error(f"Document processing error: {e}")
-        processing_tasks[task_id].status = "error"
-        processing_tasks[task_id].message = str(e)
+        if not copy_upload_with_sendfile(file.file, temp_file.fileno()):
+            # sendfile may have written part of the upload; rewind both sides
+            # so the buffered copy starts over at offset 0 instead of leaving a gap
+            file.file.seek(0)
+            temp_file.seek(0)
+            temp_file.truncate(0)
+            shutil.copyfileobj(file.file, temp_file, length=UPLOAD_COPY_CHUNK_SIZE)
+        return temp_file.name
+
+def copy_upload_with_sendfile(source, dest_fd: int) -> bool:
+    """Copy an upload into dest_fd inside the kernel with os.sendfile.
+
+    Small uploads are kept in memory by SpooledTemporaryFile, so they are
+    spilled to disk first to get a real file descriptor. Returns False when
+    sendfile is unavailable (e.g. Windows) or stops part-way, so the caller
+    can rewind and fall back to a buffered copy.
+    """
+    if not hasattr(os, 'sendfile'):
+        return False
 
-async def process_documents_background(task_id: str, files: List[UploadFile]):
-    """Background task for processing documents."""
     try:
-        # Save uploaded files temporarily
-        temp_files = []
-        for file in files:
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix)
-            content = await file.read()
-            temp_file.write(content)
-            temp_file.close()
-            temp_files.append(temp_file.name)
-        
-        # Update progress callback
-        async def progress_callback(progress: float, message: str):
-            if task_id in processing_tasks:
-                processing_tasks[task_id].progress = progress
-                processing_tasks[task_id].message = message
-
-                # Notify SSE subscribers
-                await notify_progress_subscribers(task_id, processing_tasks[task_id].dict())
-        
-        # Process documents
-        results = await backend.process_documents(temp_files, progress_callback)
+        if hasattr(source, 'rollover'):
+            source.rollover()
+        source.flush()
+        source_fd = source.fileno()
+        size = os.fstat(source_fd).st_size
+
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(dest_fd, source_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+        return offset == size
+    except (AttributeError, OSError, io.UnsupportedOperation) as e:
+        logger.debug(f"sendfile copy failed, falling back to buffered copy: {e}")
+        return False
+
+async def process_documents_background(task_id: str, temp_files: List[str]):
+    """Background task for processing uploaded documents saved to temp files."""
+    async with PROCESS_SEM:
+        try:
+            # Update progress callback
+            progress_callback = make_progress_callback(task_id)
         
-        # Update final status
-        processing_tasks[task_id].status = "completed"
-        processing_tasks[task_id].progress = 100.0
-        processing_tasks[task_id].message = "Processing completed"
-        processing_tasks[task_id].results = results
+            # Process documents
+            results = await backend.process_documents(temp_files, progress_callback)
         
-        # Cleanup temp files
-        for temp_file in temp_files:
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
+            # Update final status
+            await update_processing_task(task_id, status="completed", progress=100.0,
+                                         message="Processing completed", results=results)
                 
-    except Exception as e:
-        logger.error(f"Document processing error: {e}")
-        processing_tasks[task_id].status = "error"
-        processing_tasks[task_id].message = str(e)
+        except Exception as e:
+            logger.error(f"Document processing error: {e}")
+            await update_processing_task(task_id, status="error", message=str(e))
+
+        finally:
+            # Cleanup temp files
+            for temp_file in temp_files:
+                try:
+                    os.unlink(temp_file)
+                except:
+                    pass
 
 @app.get("/documents/processing/{task_id}")
 async def get_processing_status(task_id: str):
     """Get the status of a document processing task."""
-    if task_id not in processing_tasks:
+    task = await task_store.get(task_id)
+    if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    return processing_tasks[task_id]
+    return task
 
 @app.get("/process/status/{task_id}")
 async def get_process_status(task_id: str):
     """Get the status of a document processing task (alternative endpoint)."""
-    if task_id not in processing_tasks:
+    task = await task_store.get(task_id)
+    if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    return processing_tasks[task_id]
+    return task
+
+# Constant-shape SSE frames are built from templates; only variable payloads are serialized
+HEARTBEAT_FRAME = b'data: {"type":"heartbeat","timestamp":%.3f}\n\n'
+INITIAL_FRAME_PREFIX = b'data: {"type":"initial","data":'
 
 @app.get("/documents/processing/{task_id}/stream")
 async def stream_processing_status(task_id: str):
     """Stream real-time processing status updates via Server-Sent Events."""
-    if task_id not in processing_tasks:
+    # Subscribe before reading the current status so no transition is missed
+    subscription = await task_store.subscribe(task_id)
+    try:
+        initial_status = await task_store.get(task_id)
+    except Exception:
+        await subscription.close()
+        raise
+    if initial_status is None:
+        await subscription.close()
         raise HTTPException(status_code=404, detail="Task not found")
 
     async def event_stream():
-        # Create a queue for this subscriber
-        queue = asyncio.Queue()
-
-        # Add to subscribers
-        if task_id not in progress_subscribers:
-            progress_subscribers[task_id] = []
-        progress_subscribers[task_id].append(queue)
-
         try:
             # Send initial status
-            initial_status = processing_tasks[task_id]
-            yield f"data: {json.dumps(initial_status.dict())}\n\n"
+            yield b"data: " + encode_update(initial_status) + b"\n\n"
+            if initial_status.get('status') in TERMINAL_STATUSES:
+                return
 
-            # Stream updates
+            # Stream updates; each payload is serialized once by the store and shared by all subscribers
             while True:
-                try:
-                    # Wait for updates with timeout
-                    update = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield f"data: {json.dumps(update)}\n\n"
+                # Wait for the next update or the shared heartbeat tick
+                payload = await subscription.get()
+                if payload is None:
+                    # Send heartbeat
+                    yield HEARTBEAT_FRAME % time.time()
+                    continue
 
-                    # Break if task is completed
-                    if update.get('status') in ['completed', 'error']:
-                        break
+                yield b"data: " + payload + b"\n\n"
 
-                except asyncio.TimeoutError:
-                    # Send heartbeat
-                    yield f"data: {json.dumps({'type': 'heartbeat', 'timestamp': time.time()})}\n\n"
+                # Break if task is completed
+                if subscription.finished:
+                    break
 
         except Exception as e:
             logger.error(f"SSE stream error: {e}")
         finally:
             # Remove subscriber
-            if task_id in progress_subscribers:
-                try:
-                    progress_subscribers[task_id].remove(queue)
-                    if not progress_subscribers[task_id]:
-                        del progress_subscribers[task_id]
-                except ValueError:
-                    pass
+            await subscription.close()
 
     return StreamingResponse(
         event_stream(),
@@ -412,123 +771,133 @@ async def stream_processing_status(task_id: str):
         }
     )
 
-@app.post("/readwise/import")
+@app.post("/readwise/import", dependencies=[Depends(require_backend)])
 async def import_readwise(
     background_tasks: BackgroundTasks,
     request: ReadwiseImportRequest
 ):
     """Import Readwise highlights from markdown content."""
-    if not backend:
-        raise HTTPException(status_code=500, detail="Backend not initialized")
-    
-    # Generate task ID
-    task_id = str(uuid.uuid4())
     
-    # Initialize task status
-    processing_tasks[task_id] = DocumentProcessingStatus(
-        task_id=task_id,
-        status="processing",
-        progress=0.0,
-        message="Starting Readwise import..."
-    )
+    # Create task
+    task_id = await create_processing_task("Starting Readwise import...")
     
     # Start background processing
     background_tasks.add_task(import_readwise_background, task_id, request.folder_path)
     
     return {"task_id": task_id, "message": "Readwise import started"}
 
+READWISE_EMBED_BATCH = 128  # highlights embedded and inserted per vector store call
+READWISE_READ_AHEAD = 8  # markdown files read in the background while earlier ones embed
+
+def prefetch_text_files(paths: List[Path], window: int = READWISE_READ_AHEAD):
+    """Yield (path, read future) in order, keeping up to `window` reads in flight.
+
+    Files are read in worker threads, so reading the next files overlaps with
+    parsing and embedding the current one while memory stays bounded by the window.
+    """
+    paths = iter(paths)
+    pending = deque()
+
+    def schedule(path: Path):
+        pending.append((path, asyncio.ensure_future(asyncio.to_thread(path.read_text, encoding='utf-8'))))
+
+    for path in paths:
+        schedule(path)
+        if len(pending) >= window:
+            break
+
+    while pending:
+        item = pending.popleft()
+        next_path = next(paths, None)
+        if next_path is not None:
+            schedule(next_path)
+        yield item
+
 async def import_readwise_background(task_id: str, folder_path: str):
     """Background task for importing Readwise data."""
-    try:
-        # Update progress callback
-        async def progress_callback(progress: float, message: str):
-            if task_id in processing_tasks:
-                processing_tasks[task_id].progress = progress
-                processing_tasks[task_id].message = message
-
-                # Notify SSE subscribers
-                await notify_progress_subscribers(task_id, processing_tasks[task_id].dict())
+    async with PROCESS_SEM:
+        try:
+            # Update progress callback
+            progress_callback = make_progress_callback(task_id)
         
-        # Import highlights from folder
-        from pathlib import Path
+            # Import highlights from folder
+            from pathlib import Path
 
-        folder = Path(folder_path)
-        if not folder.exists():
-            raise ValueError(f"Folder does not exist: {folder_path}")
+            folder = Path(folder_path)
+            if not folder.exists():
+                raise ValueError(f"Folder does not exist: {folder_path}")
 
-        await progress_callback(10.0, "Scanning for markdown files...")
+            await progress_callback(10.0, "Scanning for markdown files...")
 
-        # Find markdown files
-        markdown_files = list(folder.glob("*.md")) + list(folder.glob("*.markdown"))
+            # Find markdown files
+            markdown_files = list(folder.glob("*.md")) + list(folder.glob("*.markdown"))
 
-        if not markdown_files:
-            raise ValueError("No markdown files found in the specified folder")
+            if not markdown_files:
+                raise ValueError("No markdown files found in the specified folder")
 
-        await progress_callback(20.0, f"Found {len(markdown_files)} markdown files")
+            await progress_callback(20.0, f"Found {len(markdown_files)} markdown files")
 
-        total_highlights = 0
-        processed_files = 0
+            total_highlights = 0
+            processed_files = 0
 
-        for i, file_path in enumerate(markdown_files):
-            try:
-                await progress_callback(20.0 + (i / len(markdown_files)) * 60.0, f"Processing {file_path.name}...")
-
-                # Import highlights from this file
-                highlights = await backend.readwise_importer.import_from_file(str(file_path))
-
-                if highlights:
-                    # Store highlights in vector database
-                    for highlight in highlights:
-                        # Create a document-like structure for the highlight
-                        highlight_doc = {
-                            'content': highlight['text'],
-                            'metadata': {
-                                'source': f"readwise_{highlight['book']}",
-                                'book': highlight['book'],
-                                'author': highlight['author'],
-                                'highlight_id': highlight['id'],
-                                'tags': highlight.get('tags', []),
-                                'location': highlight.get('location', ''),
-                                'note': highlight.get('note', ''),
-                                'source_type': 'readwise'
-                            }
-                        }
-
-                        # Add to vector store
-                        await backend.vector_store.add_single_document(
-                            content=highlight_doc['content'],
-                            metadata=highlight_doc['metadata']
-                        )
-
-                    total_highlights += len(highlights)
-                    processed_files += 1
-
-            except Exception as e:
-                logger.error(f"Error processing {file_path}: {e}")
-                continue
-
-        results = {
-            "highlights_imported": total_highlights,
-            "files_processed": processed_files,
-            "total_files": len(markdown_files)
-        }
+            for i, (file_path, read) in enumerate(prefetch_text_files(markdown_files)):
+                try:
+                    await progress_callback(20.0 + (i / len(markdown_files)) * 60.0, f"Processing {file_path.name}...")
+                    content = await read
+
+                    # Stream highlights from this file and embed them in batches,
+                    # so only one batch is held in memory at a time
+                    contents, metadatas = [], []
+                    file_highlights = 0
+
+                    async for highlight in backend.readwise_importer.iter_highlights(content):
+                        contents.append(highlight['text'])
+                        metadatas.append({
+                            'source': f"readwise_{highlight['book']}",
+                            'book': highlight['book'],
+                            'author': highlight['author'],
+                            'highlight_id': highlight['id'],
+                            'tags': highlight.get('tags', []),
+                            'location': highlight.get('location', ''),
+                            'note': highlight.get('note', ''),
+                            'source_type': 'readwise'
+                        })
+
+                        if len(contents) >= READWISE_EMBED_BATCH:
+                            await backend.vector_store.add_documents_batch(contents, metadatas)
+                            file_highlights += len(contents)
+                            contents, metadatas = [], []
+                            await progress_callback(20.0 + (i / len(markdown_files)) * 60.0,
+                                                    f"Imported {file_highlights} highlights from {file_path.name}...")
+
+                    await backend.vector_store.add_documents_batch(contents, metadatas)
+                    file_highlights += len(contents)
+
+                    if file_highlights:
+                        total_highlights += file_highlights
+                        processed_files += 1
+
+                except Exception as e:
+                    logger.error(f"Error processing {file_path}: {e}")
+                    continue
+
+            results = {
+                "highlights_imported": total_highlights,
+                "files_processed": processed_files,
+                "total_files": len(markdown_files)
+            }
         
-        # Update final status
-        processing_tasks[task_id].status = "completed"
-        processing_tasks[task_id].progress = 100.0
-        processing_tasks[task_id].message = "Import completed"
-        processing_tasks[task_id].results = results
+            # Update final status
+            await update_processing_task(task_id, status="completed", progress=100.0,
+                                         message="Import completed", results=results)
         
-    except Exception as e:
-        logger.error(f"Readwise import error: {e}")
-        processing_tasks[task_id].status = "error"
-        processing_tasks[task_id].message = str(e)
+        except Exception as e:
+            logger.error(f"Readwise import error: {e}")
+            await update_processing_task(task_id, status="error", message=str(e))
 
-@app.get("/stats", response_model=StatsResponse)
+@app.get("/stats", response_model=StatsResponse, dependencies=[Depends(require_backend)])
 async def get_stats():
     """Get statistics about indexed documents."""
-    if not backend:
-        raise HTTPException(status_code=500, detail="Backend not initialized")
     
     try:
         stats = await backend.get_stats()
@@ -537,35 +906,44 @@ async def get_stats():
         logger.error(f"Stats error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/suggestions")
-async def get_search_suggestions(q: str):
+@app.get("/suggestions", dependencies=[Depends(require_backend)])
+async def get_search_suggestions(q: str, http_request: Request):
     """Get search suggestions based on query prefix."""
-    if not backend:
-        raise HTTPException(status_code=500, detail="Backend not initialized")
     
     if len(q) < 2:
         return {"suggestions": []}
     
     try:
-        # For now, return some basic suggestions
-        # This could be enhanced to use the search engine's suggestion functionality
-        suggestions = await backend.search_engine.get_suggestions(q)
-        return {"suggestions": suggestions}
+        # Typeahead prefixes repeat a lot; long queries rarely do, so skip caching them
+        prefix = q.strip().lower()
+        cacheable = len(prefix) <= SUGGESTIONS_CACHE_MAX_QUERY
+        generation = content_generation()
+        cache_key = (generation, prefix)
+        cached = suggestions_cache.get(cache_key) if cacheable else None
+        if cached is None:
+            # For now, return some basic suggestions
+            # This could be enhanced to use the search engine's suggestion functionality
+            suggestions = await backend.search_engine.get_suggestions(q)
+            body = orjson.dumps({"suggestions": suggestions}, option=ORJSON_OPTIONS)
+            cached = tagged_response(body, generation)
+            if cacheable:
+                suggestions_cache.set(cache_key, cached)
+
+        return cached_json_response(http_request, cached)
     except Exception as e:
         logger.error(f"Suggestions error: {e}")
         return {"suggestions": []}
 
-@app.delete("/documents/clear")
+@app.delete("/documents/clear", dependencies=[Depends(require_backend)])
 async def clear_all_documents():
     """Clear all documents from the database (for testing)."""
-    if not backend:
-        raise HTTPException(status_code=500, detail="Backend not initialized")
 
     try:
         # Clear all documents from the vector store
         if backend.vector_store and backend.vector_store.table:
-            # Delete all rows from the table
-            backend.vector_store.table.delete("id IS NOT NULL")
+            # Drop and recreate the table rather than deleting every row by predicate
+            await backend.vector_store.clear()
+            invalidate_search_caches()
             logger.info("All documents cleared from database")
             return {"message": "All documents cleared successfully", "cleared_count": "all"}
         else:
@@ -574,6 +952,50 @@ async def clear_all_documents():
         logger.error(f"Clear error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+SUPPORTED_SCAN_EXTENSIONS = frozenset({'.txt', '.md', '.pdf', '.docx'})
+SCAN_PARALLEL_STAT_BATCH = 256  # below this, thread hand-offs cost more than they save
+
+def list_supported_entries(folder_path: str, supported_extensions: frozenset = SUPPORTED_SCAN_EXTENSIONS) -> List[tuple]:
+    """Recursively collect (DirEntry, extension) for supported files (blocking, run in a thread)."""
+    return list(walk_supported_files(folder_path, supported_extensions))
+
+def describe_entries(entries: List[tuple], prefix_len: int) -> List[Dict[str, Any]]:
+    """Stat listed entries into file info dicts (blocking, run in a thread)."""
+    files = []
+    for entry, extension in entries:
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue  # removed or unreadable since the walk
+        files.append({
+            "name": entry.name,
+            "path": entry.path,
+            "size": stat.st_size,
+            "modified": stat.st_mtime,
+            "extension": extension,
+            "type": "file",
+            "relative_path": entry.path[prefix_len:]
+        })
+    return files
+
+async def scan_supported_files(folder_path: Path, supported_extensions: frozenset = SUPPORTED_SCAN_EXTENSIONS) -> List[Dict[str, Any]]:
+    """Recursively collect file info for supported files without blocking the event loop."""
+    root = str(folder_path)
+    prefix_len = len(os.path.join(root, ''))  # entry paths are root + separator + relative path
+    entries = await run_io(list_supported_entries, root, supported_extensions)
+
+    # DirEntry.stat() is served from the directory listing on Windows; elsewhere
+    # overlap the stat syscalls of large trees by fanning batches out from here,
+    # so no pool thread ever blocks waiting on other tasks in the same pool
+    if os.name == 'nt' or len(entries) < SCAN_PARALLEL_STAT_BATCH:
+        return await run_io(describe_entries, entries, prefix_len)
+
+    batches = await asyncio.gather(*(
+        run_io(describe_entries, entries[i:i + SCAN_PARALLEL_STAT_BATCH], prefix_len)
+        for i in range(0, len(entries), SCAN_PARALLEL_STAT_BATCH)
+    ))
+    return [file_info for batch in batches for file_info in batch]
+
 @app.post("/folders/scan")
 async def scan_folder(request: FolderScanRequest):
     """Scan a folder for supported files."""
@@ -585,45 +1007,36 @@ async def scan_folder(request: FolderScanRequest):
         if not folder_path.exists():
             raise HTTPException(status_code=404, detail="Folder not found")
 
-        supported_extensions = {'.txt', '.md', '.pdf', '.docx'}
-        files = []
-
         # Get folder manager for indexing status if available
-        folder_manager = None
-        if backend and hasattr(backend, 'folder_manager'):
-            folder_manager = backend.folder_manager
-
-        for file_path in folder_path.rglob('*'):
-            if file_path.is_file() and file_path.suffix.lower() in supported_extensions:
-                stat = file_path.stat()
-                file_info = {
-                    "name": file_path.name,
-                    "path": str(file_path),
-                    "size": stat.st_size,
-                    "modified": stat.st_mtime,
-                    "extension": file_path.suffix.lower(),
-                    "type": "file",
-                    "relative_path": str(file_path.relative_to(folder_path))
-                }
-
-                # Add indexing status if folder manager is available
-                if folder_manager:
-                    indexing_status = folder_manager.get_indexing_status(str(file_path))
-                    file_info.update({
-                        "indexing_status": indexing_status.get('status', 'unknown'),
-                        "indexing_progress": indexing_status.get('progress', 0.0),
-                        "indexing_error": indexing_status.get('error'),
-                        "needs_processing": folder_manager.file_needs_processing(str(file_path), stat.st_mtime)
-                    })
-                else:
-                    file_info.update({
-                        "indexing_status": "unknown",
-                        "indexing_progress": 0.0,
-                        "indexing_error": None,
-                        "needs_processing": True
-                    })
-
-                files.append(file_info)
+        folder_manager = backend.folder_manager if backend else None
+
+        # Walk and stat the tree in the I/O pool to keep the event loop free
+        files = await scan_supported_files(folder_path)
+
+        if folder_manager:
+            # Look up status directly in the folder manager's map instead of
+            # copying it per file; processing checks stay in the manager
+            all_status = folder_manager.indexing_status
+            file_needs_processing = folder_manager.file_needs_processing
+            unknown_status = {'status': 'unknown'}
+
+            for file_info in files:
+                path = file_info["path"]
+                indexing_status = all_status.get(path, unknown_status)
+                file_info.update({
+                    "indexing_status": indexing_status.get('status', 'unknown'),
+                    "indexing_progress": indexing_status.get('progress', 0.0),
+                    "indexing_error": indexing_status.get('error'),
+                    "needs_processing": file_needs_processing(path, file_info["modified"])
+                })
+        else:
+            for file_info in files:
+                file_info.update({
+                    "indexing_status": "unknown",
+                    "indexing_progress": 0.0,
+                    "indexing_error": None,
+                    "needs_processing": True
+                })
 
         return {"files": files, "folder_path": str(folder_path)}
 
@@ -648,13 +1061,10 @@ async def add_folder(request: FolderAddRequest):
     return {"message": f"Folder {request.folder_path} added successfully"}
 
 @app.get("/indexing/status")
-async def get_indexing_status(file_path: Optional[str] = None):
+async def get_indexing_status(file_path: Optional[str] = None,
+                              folder_manager: FolderManager = Depends(require_folder_manager)):
     """Get indexing status for files."""
-    if not backend or not hasattr(backend, 'folder_manager'):
-        raise HTTPException(status_code=500, detail="Backend not initialized")
-
     try:
-        folder_manager = backend.folder_manager
         if file_path:
             status = folder_manager.get_indexing_status(file_path)
             return {"file_path": file_path, "status": status}
@@ -666,14 +1076,10 @@ async def get_indexing_status(file_path: Optional[str] = None):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/indexing/trigger")
-async def trigger_indexing(request: TriggerIndexingRequest):
+async def trigger_indexing(request: TriggerIndexingRequest,
+                           folder_manager: FolderManager = Depends(require_folder_manager)):
     """Trigger indexing for specific files."""
-    if not backend or not hasattr(backend, 'folder_manager'):
-        raise HTTPException(status_code=500, detail="Backend not initialized")
-
     try:
-        folder_manager = backend.folder_manager
-
         # Queue files for processing
         for file_path in request.file_paths:
             folder_manager.queue_file_for_processing(file_path, 'manual_trigger')
@@ -686,11 +1092,9 @@ async def trigger_indexing(request: TriggerIndexingRequest):
         logger.error(f"Error triggering indexing: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/indexing/process-direct")
+@app.post("/indexing/process-direct", dependencies=[Depends(require_backend)])
 async def process_files_directly(request: TriggerIndexingRequest):
     """Directly process files using the backend (for testing)."""
-    if not backend:
-        raise HTTPException(status_code=500, detail="Backend not initialized")
 
     try:
         # Process files directly using the backend
@@ -704,41 +1108,69 @@ async def process_files_directly(request: TriggerIndexingRequest):
         logger.error(f"Error processing files directly: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.websocket("/ws/tasks/{task_id}")
+async def task_status_websocket(websocket: WebSocket, task_id: str):
+    """Push processing status updates over a WebSocket instead of polling."""
+    await websocket.accept()
+
+    # Subscribe before reading the current status so no transition is missed
+    subscription = await task_store.subscribe(task_id)
+    try:
+        initial_status = await task_store.get(task_id)
+        if initial_status is None:
+            await websocket.close(code=4404, reason="Task not found")
+            return
+
+        await websocket.send_text(encode_update(initial_status).decode())
+        if initial_status.get('status') in TERMINAL_STATUSES:
+            await websocket.close()
+            return
+
+        while True:
+            payload = await subscription.get()
+            if payload is None:
+                continue  # heartbeat tick; the WebSocket layer keeps the connection alive
+
+            await websocket.send_text(payload.decode())
+            if subscription.finished:
+                await websocket.close()
+                break
+
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Task WebSocket error: {e}")
+    finally:
+        await subscription.close()
+
 @app.get("/indexing/status/stream")
-async def stream_indexing_status():
+async def stream_indexing_status(folder_manager: FolderManager = Depends(require_folder_manager)):
     """Stream real-time indexing status updates via Server-Sent Events."""
-    if not backend or not hasattr(backend, 'folder_manager'):
-        raise HTTPException(status_code=500, detail="Backend not initialized")
 
     async def event_stream():
-        # Create a queue for this subscriber
-        queue = asyncio.Queue()
-        folder_manager = backend.folder_manager
+        broadcast = folder_manager.status_broadcast
 
-        # Add to subscribers
-        folder_manager.add_status_subscriber(queue)
+        # Start reading the shared status ring from its current end
+        cursor = broadcast.cursor()
 
         try:
             # Send initial status
             initial_status = folder_manager.get_indexing_status()
-            yield f"data: {json.dumps({'type': 'initial', 'data': initial_status})}\n\n"
+            yield INITIAL_FRAME_PREFIX + orjson.dumps(initial_status, default=str) + b"}\n\n"
 
             # Stream updates
             while True:
-                try:
-                    # Wait for updates with timeout
-                    update = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield f"data: {json.dumps(update)}\n\n"
-
-                except asyncio.TimeoutError:
+                updates, cursor = await broadcast.wait(cursor, timeout=30.0)
+                if not updates:
                     # Send heartbeat
-                    yield f"data: {json.dumps({'type': 'heartbeat', 'timestamp': time.time()})}\n\n"
+                    yield HEARTBEAT_FRAME % time.time()
+                    continue
+
+                # Frame every pending update and send them in one write
+                yield b"".join(b"data: " + orjson.dumps(update, default=str) + b"\n\n" for update in updates)
 
         except asyncio.CancelledError:
             pass
-        finally:
-            # Remove subscriber
-            folder_manager.remove_status_subscriber(queue)
 
     return StreamingResponse(
         event_stream(),
@@ -767,29 +1199,35 @@ class SettingsRequest(BaseModel):
     showNotifications: Optional[bool] = True
     showErrors: Optional[bool] = True
 
+SETTINGS_FILE = Path("settings.json")
+DEFAULT_SETTINGS = {
+    "theme": "system",
+    "chunkSize": 1000,
+    "chunkOverlap": 200,
+    "autoIndex": True,
+    "alwaysOnTop": False,
+    "autoHide": True,
+    "showNotifications": True,
+    "showErrors": True
+}
+
+def read_settings_file() -> Dict[str, Any]:
+    """Load saved settings, or the defaults if none were saved (blocking)."""
+    if SETTINGS_FILE.exists():
+        with open(SETTINGS_FILE, 'r') as f:
+            return json.load(f)
+    return dict(DEFAULT_SETTINGS)
+
+def write_settings_file(settings: Dict[str, Any]):
+    """Save settings to disk (blocking)."""
+    with open(SETTINGS_FILE, 'w') as f:
+        json.dump(settings, f, indent=2)
+
 @app.get("/settings")
 async def get_settings():
     """Get current application settings."""
     try:
-        # Load settings from config
-        settings_file = Path("settings.json")
-        if settings_file.exists():
-            with open(settings_file, 'r') as f:
-                settings = json.load(f)
-        else:
-            # Default settings
-            settings = {
-                "theme": "system",
-                "chunkSize": 1000,
-                "chunkOverlap": 200,
-                "autoIndex": True,
-                "alwaysOnTop": False,
-                "autoHide": True,
-                "showNotifications": True,
-                "showErrors": True
-            }
-
-        return settings
+        return await asyncio.to_thread(read_settings_file)
 
     except Exception as e:
         logger.error(f"Error getting settings: {e}")
@@ -800,15 +1238,13 @@ async def update_settings(request: SettingsRequest):
     """Update application settings."""
     try:
         # Convert to dict
-        settings = request.dict()
+        settings = request.model_dump()
 
         # Save to file
-        settings_file = Path("settings.json")
-        with open(settings_file, 'w') as f:
-            json.dump(settings, f, indent=2)
+        await asyncio.to_thread(write_settings_file, settings)
 
         # Update backend config if needed
-        if backend and hasattr(backend, 'config'):
+        if backend:
             backend.config.chunk_size = settings.get('chunkSize', 1000)
             backend.config.chunk_overlap = settings.get('chunkOverlap', 200)
 
@@ -819,11 +1255,9 @@ async def update_settings(request: SettingsRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 # Document Management Endpoints
-@app.get("/documents")
+@app.get("/documents", dependencies=[Depends(require_backend)])
 async def get_documents(limit: int = 50, offset: int = 0):
     """Get list of indexed documents."""
-    if not backend:
-        raise HTTPException(status_code=500, detail="Backend not initialized")
 
     try:
         # Get documents from vector store
@@ -839,41 +1273,59 @@ async def get_documents(limit: int = 50, offset: int = 0):
         logger.error(f"Error getting documents: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.delete("/documents/{document_id}")
+@app.delete("/documents/{document_id}", dependencies=[Depends(require_backend)])
 async def delete_document(document_id: str):
     """Delete a specific document."""
-    if not backend:
-        raise HTTPException(status_code=500, detail="Backend not initialized")
 
     try:
         # Delete from vector store
         await backend.vector_store.delete_document(document_id)
+        invalidate_search_caches()
         return {"status": "success", "message": f"Document {document_id} deleted"}
 
     except Exception as e:
         logger.error(f"Error deleting document: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/database/clear")
+@app.post("/documents/delete", dependencies=[Depends(require_backend)])
+@app.post("/documents/batch_delete", dependencies=[Depends(require_backend)])
+async def delete_documents(request: DeleteDocumentsRequest):
+    """Delete several documents in one table operation."""
+
+    try:
+        deleted = await backend.vector_store.delete_documents(request.ids)
+        invalidate_search_caches()
+        return {"status": "success", "deleted_count": deleted}
+
+    except Exception as e:
+        logger.error(f"Error deleting documents: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/database/clear", dependencies=[Depends(require_backend)])
 async def clear_database():
     """Clear all data from the database."""
-    if not backend:
-        raise HTTPException(status_code=500, detail="Backend not initialized")
 
     try:
         # Clear vector store
         await backend.vector_store.clear()
+        invalidate_search_caches()
         return {"status": "success", "message": "Database cleared successfully"}
 
     except Exception as e:
         logger.error(f"Error clearing database: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/suggestions")
+@app.post("/maintenance/vacuum", dependencies=[Depends(require_backend)])
+async def vacuum_database():
+    """Physically remove deleted rows and compact the vector store."""
+
+    if not await backend.vector_store.compact():
+        raise HTTPException(status_code=500, detail="Compaction failed")
+    return {"status": "success", "message": "Database compacted"}
+
+@app.get("/suggestions", dependencies=[Depends(require_backend)])
 async def get_suggestions(q: str = ""):
     """Get search suggestions based on partial query."""
-    if not backend:
-        raise HTTPException(status_code=500, detail="Backend not initialized")
 
     try:
         # Get suggestions from search engine
@@ -887,17 +1339,26 @@ async def get_suggestions(q: str = ""):
 @app.get("/process/status/{task_id}")
 async def get_processing_status(task_id: str):
     """Get the status of a processing task."""
-    if task_id not in processing_tasks:
+    task = await task_store.get(task_id)
+    if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    return processing_tasks[task_id].dict()
+    return task
 
 # ============================================================================
 # NEW ENHANCED API ENDPOINTS
 # ============================================================================
 
 # Citation Management Endpoints
+class Importance(str, Enum):
+    low = "low"
+    medium = "medium"
+    high = "high"
+
 class CitationRequest(BaseModel):
+    # Enum values are stored, so every citation shares the same importance strings
+    model_config = ConfigDict(str_strip_whitespace=True, use_enum_values=True)
+
     content: str
     source_id: str
     page: Optional[str] = ""
@@ -905,9 +1366,11 @@ class CitationRequest(BaseModel):
     highlight_color: Optional[str] = ""
     user_note: Optional[str] = ""
     tags: Optional[List[str]] = []
-    importance: Optional[str] = "medium"
+    importance: Optional[Importance] = Importance.medium.value
 
 class SourceRequest(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     title: str
     author: Optional[str] = ""
     authors: Optional[List[str]] = []
@@ -920,96 +1383,147 @@ class SourceRequest(BaseModel):
     tags: Optional[List[str]] = []
     notes: Optional[str] = ""
 
-@app.post("/citations/sources")
-async def register_source(source: SourceRequest):
+# Response models let FastAPI serialize through pydantic-core instead of jsonable_encoder
+class CitationRecord(BaseModel):
+    id: str
+    content: str
+    source_id: str
+    page: str = ""
+    location: str = ""
+    highlight_color: str = ""
+    user_note: str = ""
+    tags: List[str] = []
+    importance: str = "medium"
+    context: str = ""
+    created_at: str
+    updated_at: str
+    citation_style: str
+    metadata: Dict[str, Any] = {}
+
+class CitationCreateResponse(BaseModel):
+    citation: CitationRecord
+    message: str
+
+class CitationBatchResponse(BaseModel):
+    citations: List[CitationRecord]
+    count: int
+    message: str
+
+class SourceCreateResponse(BaseModel):
+    source_id: str
+    message: str
+
+class FormattedCitationResponse(BaseModel):
+    formatted_citation: str
+
+# Statistics cached across workers (Redis task store only); citation writes invalidate theirs
+SHARED_STATS_TTL = 15.0  # seconds
+CITATION_STATS_CACHE_KEY = "citations:stats:v1"
+TASK_STATS_CACHE_KEY = "tasks:stats:v1"
+
+@app.post("/citations/sources", response_model=SourceCreateResponse)
+async def register_source(source: SourceRequest, citation_manager: CitationManager = Depends(require_citation_manager)):
     """Register a new source for citations."""
     try:
-        if not backend or not hasattr(backend, 'citation_manager'):
-            raise HTTPException(status_code=503, detail="Citation manager not available")
-
-        source_id = backend.citation_manager.register_source(source.dict())
+        source_id = citation_manager.register_source(source.model_dump(exclude_none=True))
+        await task_store.delete_cached(CITATION_STATS_CACHE_KEY)
         return {"source_id": source_id, "message": "Source registered successfully"}
     except Exception as e:
         logger.error(f"Error registering source: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/citations")
-async def create_citation(citation: CitationRequest):
+@app.post("/citations", response_model=CitationCreateResponse)
+async def create_citation(citation: CitationRequest, citation_manager: CitationManager = Depends(require_citation_manager)):
     """Create a new citation."""
     try:
-        if not backend or not hasattr(backend, 'citation_manager'):
-            raise HTTPException(status_code=503, detail="Citation manager not available")
-
-        citation_obj = backend.citation_manager.create_citation(**citation.dict())
+        citation_obj = citation_manager.create_citation(**citation.model_dump(exclude_none=True))
+        await task_store.delete_cached(CITATION_STATS_CACHE_KEY)
         return {"citation": citation_obj, "message": "Citation created successfully"}
     except Exception as e:
         logger.error(f"Error creating citation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/citations/{citation_id}/format")
-async def format_citation(citation_id: str, style: Optional[str] = "apa"):
-    """Format a citation in the specified style."""
+@app.post("/citations/batch", response_model=CitationBatchResponse)
+async def create_citations_batch(citations: List[CitationRequest],
+                                 citation_manager: CitationManager = Depends(require_citation_manager)):
+    """Create several citations in one request and one database save."""
     try:
-        if not backend or not hasattr(backend, 'citation_manager'):
-            raise HTTPException(status_code=503, detail="Citation manager not available")
+        created = citation_manager.create_citations_bulk(
+            [citation.model_dump(exclude_none=True) for citation in citations]
+        )
+        await task_store.delete_cached(CITATION_STATS_CACHE_KEY)
+        return {"citations": created, "count": len(created), "message": "Citations created successfully"}
+    except Exception as e:
+        logger.error(f"Error creating citations: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        formatted = backend.citation_manager.format_citation(citation_id, style)
+@app.get("/citations/{citation_id}/format", response_model=FormattedCitationResponse)
+async def format_citation(citation_id: str, style: Optional[str] = "apa", citation_manager: CitationManager = Depends(require_citation_manager)):
+    """Format a citation in the specified style."""
+    try:
+        formatted = citation_manager.format_citation(citation_id, style)
         return {"formatted_citation": formatted}
     except Exception as e:
         logger.error(f"Error formatting citation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/citations/statistics")
-async def get_citation_statistics():
+async def get_citation_statistics(citation_manager: CitationManager = Depends(require_citation_manager)):
     """Get citation database statistics."""
     try:
-        if not backend or not hasattr(backend, 'citation_manager'):
-            raise HTTPException(status_code=503, detail="Citation manager not available")
-
-        stats = backend.citation_manager.get_statistics()
-        return stats
+        body = await task_store.get_cached(CITATION_STATS_CACHE_KEY)
+        if body is None:
+            body = orjson.dumps(citation_manager.get_statistics())
+            await task_store.set_cached(CITATION_STATS_CACHE_KEY, body, SHARED_STATS_TTL)
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         logger.error(f"Error getting citation statistics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # Background Processing Endpoints
 @app.get("/tasks")
-async def get_tasks():
+async def get_tasks(background_processor: BackgroundProcessor = Depends(require_background_processor)):
     """Get all background tasks."""
     try:
-        if not backend or not hasattr(backend, 'background_processor'):
-            raise HTTPException(status_code=503, detail="Background processor not available")
-
-        summary = backend.background_processor.get_task_summary()
-        return summary
+        summary = background_processor.get_task_summary()
+        return Response(content=orjson.dumps(summary, default=str), media_type="application/json")
     except Exception as e:
         logger.error(f"Error getting tasks: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Registered before /tasks/{task_id} so "statistics" is not taken for a task ID
+@app.get("/tasks/statistics")
+async def get_processing_statistics(background_processor: BackgroundProcessor = Depends(require_background_processor)):
+    """Get background processing statistics."""
+    try:
+        body = await task_store.get_cached(TASK_STATS_CACHE_KEY)
+        if body is None:
+            body = orjson.dumps(background_processor.get_statistics(), default=str)
+            await task_store.set_cached(TASK_STATS_CACHE_KEY, body, SHARED_STATS_TTL)
+        return Response(content=body, media_type="application/json")
+    except Exception as e:
+        logger.error(f"Error getting processing statistics: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/tasks/{task_id}")
-async def get_task(task_id: str):
+async def get_task(task_id: str, background_processor: BackgroundProcessor = Depends(require_background_processor)):
     """Get a specific task by ID."""
     try:
-        if not backend or not hasattr(backend, 'background_processor'):
-            raise HTTPException(status_code=503, detail="Background processor not available")
-
-        task = backend.background_processor.get_task(task_id)
+        task = background_processor.get_task(task_id)
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
 
-        return {"task": task.__dict__}
+        # orjson encodes the task dataclass and its enums natively, without an intermediate dict
+        return Response(content=orjson.dumps({"task": task}, default=str), media_type="application/json")
     except Exception as e:
         logger.error(f"Error getting task: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/tasks/{task_id}")
-async def cancel_task(task_id: str):
+async def cancel_task(task_id: str, background_processor: BackgroundProcessor = Depends(require_background_processor)):
     """Cancel a background task."""
     try:
-        if not backend or not hasattr(backend, 'background_processor'):
-            raise HTTPException(status_code=503, detail="Background processor not available")
-
-        success = await backend.background_processor.cancel_task(task_id)
+        success = await background_processor.cancel_task(task_id)
         if success:
             return {"message": "Task cancelled successfully"}
         else:
@@ -1018,21 +1532,10 @@ async def cancel_task(task_id: str):
         logger.error(f"Error cancelling task: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/tasks/statistics")
-async def get_processing_statistics():
-    """Get background processing statistics."""
-    try:
-        if not backend or not hasattr(backend, 'background_processor'):
-            raise HTTPException(status_code=503, detail="Background processor not available")
-
-        stats = backend.background_processor.get_statistics()
-        return stats
-    except Exception as e:
-        logger.error(f"Error getting processing statistics: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
 # User Annotation Endpoints
 class UserAnnotationRequest(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     file_path: str
     page_num: int
     annotation_data: Dict[str, Any]
@@ -1047,13 +1550,10 @@ class HighlightCaptureRequest(BaseModel):
     is_highlight: bool = True
 
 @app.post("/annotations")
-async def add_user_annotation(annotation: UserAnnotationRequest):
+async def add_user_annotation(annotation: UserAnnotationRequest, document_processor: DocumentProcessor = Depends(require_document_processor)):
     """Add a user annotation to a document."""
     try:
-        if not backend or not hasattr(backend, 'document_processor'):
-            raise HTTPException(status_code=503, detail="Document processor not available")
-
-        success = await backend.document_processor.add_user_annotation(
+        success = await document_processor.add_user_annotation(
             annotation.file_path,
             annotation.page_num,
             annotation.annotation_data
@@ -1067,28 +1567,48 @@ async def add_user_annotation(annotation: UserAnnotationRequest):
         logger.error(f"Error adding annotation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+NDJSON_YIELD_EVERY = 256  # items serialized between event-loop yields
+
+async def iter_ndjson(items: List[Dict[str, Any]]):
+    """Serialize items as newline-delimited JSON, yielding to the loop periodically."""
+    for count, item in enumerate(items, 1):
+        yield orjson.dumps(item) + b"\n"
+        if count % NDJSON_YIELD_EVERY == 0:
+            await asyncio.sleep(0)
+
 @app.get("/annotations/{file_path:path}")
-async def get_user_annotations(file_path: str):
-    """Get all user annotations for a document."""
+async def get_user_annotations(file_path: str, request: Request,
+                               document_processor: DocumentProcessor = Depends(require_document_processor)):
+    """Get all user annotations for a document.
+
+    Clients sending ``Accept: application/x-ndjson`` get one annotation per
+    line, streamed, instead of a single JSON document. Responses carry an
+    ETag derived from the annotation file's mtime and size, so unchanged
+    annotations revalidate with a 304 without being read or encoded.
+    """
     try:
-        if not backend or not hasattr(backend, 'document_processor'):
-            raise HTTPException(status_code=503, detail="Document processor not available")
-
-        annotations = await backend.document_processor.get_user_annotations(file_path)
-        return {"annotations": annotations}
+        ndjson = "application/x-ndjson" in request.headers.get("accept", "")
+        version = await document_processor.get_annotations_version(file_path)
+        etag = make_etag(f"{file_path}\0{version}\0{ndjson}".encode())
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        annotations = await document_processor.get_user_annotations(file_path)
+        if ndjson:
+            return StreamingResponse(iter_ndjson(annotations), media_type="application/x-ndjson", headers=headers)
+        # Returning the response directly skips FastAPI's jsonable_encoder pass
+        return ORJSONResponse({"annotations": annotations}, headers=headers)
     except Exception as e:
         logger.error(f"Error getting annotations: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # Auto-Indexer Endpoints
 @app.get("/indexer/status")
-async def get_indexer_status():
+async def get_indexer_status(auto_indexer: AutoIndexer = Depends(require_auto_indexer)):
     """Get auto-indexer status."""
     try:
-        if not backend or not hasattr(backend, 'auto_indexer'):
-            raise HTTPException(status_code=503, detail="Auto-indexer not available")
-
-        status = backend.auto_indexer.get_status()
+        status = auto_indexer.get_status()
         return {
             "status": "success",
             "indexer": status
@@ -1098,13 +1618,10 @@ async def get_indexer_status():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/indexer/scan")
-async def trigger_scan():
+async def trigger_scan(auto_indexer: AutoIndexer = Depends(require_auto_indexer)):
     """Trigger manual scan and indexing."""
     try:
-        if not backend or not hasattr(backend, 'auto_indexer'):
-            raise HTTPException(status_code=503, detail="Auto-indexer not available")
-
-        indexed_count = await backend.auto_indexer.initial_indexing()
+        indexed_count = await auto_indexer.initial_indexing()
         return {
             "status": "success",
             "message": f"Scan completed: {indexed_count} files indexed"
@@ -1188,10 +1705,5 @@ async def stop_document_monitoring():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(
-        "api_server:app",
-        host="127.0.0.1",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
+    from start_backend import uvicorn_options
+    uvicorn.run("api_service:app", **uvicorn_options())
@@ -10,15 +10,59 @@ import time
 import logging
 import threading
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Tuple
 import hashlib
-import json
+import orjson
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+from executors import run_io
+from file_scan import walk_supported_files
+
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Files are hashed in chunks of this size, so large PDFs never sit in memory whole
+HASH_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Hashes only fingerprint content changes, so use the fastest available; entries
+# without a 'hash_algorithm' were written with md5 and are still compared with it
+FILE_HASH_ALGORITHM = 'blake3' if BLAKE3_AVAILABLE else 'blake2b'
+LEGACY_HASH_ALGORITHM = 'md5'
+
+# Files indexed at once during a folder scan, so one slow PDF doesn't hold up the rest
+INDEX_CONCURRENCY = 4
+
+# Index state changes are written at most this often (seconds), so a scan rewrites the file once, not per file
+INDEX_STATE_SAVE_DELAY = 2.0
+
+# The index state is an append-only log of upserts and deletes; it is rewritten
+# (compacted) on load once it holds this many times more lines than live entries
+INDEX_LOG_COMPACT_RATIO = 2
+
+# Watchdog events for a path coalesce until it has been quiet this long (seconds);
+# settled events are picked up by a task that wakes every CHANGE_POLL_INTERVAL
+CHANGE_DEBOUNCE_SECONDS = 1.0
+CHANGE_POLL_INTERVAL = 0.5
+
+# Directories never descended into while scanning (version control, dependencies, caches);
+# names starting with '.' are skipped as well unless skip_hidden_dirs is turned off
+SKIPPED_DIR_NAMES = frozenset({'.git', '.hg', '.svn', 'node_modules', '.venv', 'venv', '__pycache__', '.idea'})
+
+def new_hasher(algorithm: str):
+    """Create a hash object for a file fingerprint algorithm."""
+    if algorithm == 'blake3':
+        if not BLAKE3_AVAILABLE:
+            raise ValueError("blake3 is not installed")
+        return blake3.blake3(max_threads=blake3.blake3.AUTO)
+    return hashlib.new(algorithm)
+
 class AutoIndexer:
     """Automatic file indexer with real-time monitoring."""
     
@@ -49,94 +93,224 @@ class AutoIndexer:
         ]
         
         # File tracking
-        self.indexed_files = {}  # file_path -> {hash, timestamp, size}
-        self.index_file = "data/indexed_files.json"
+        self.indexed_files = {}  # file_path -> {hash, hash_algorithm, timestamp, mtime_ns, size}
+        self.checked_file_info = {}  # file_path -> info hashed by should_index_file, reused by index_file
+        self.index_file = "data/indexed_files.json"  # legacy full snapshot, migrated on load
+        self.index_log = "data/indexed_files.jsonl"
+        self.index_state_dirty = False
+        self._pending_log = []  # log entries not yet appended
+        self._rewrite_log = False  # next flush writes a compacted log instead of appending
+        self._save_handle = None  # pending loop.call_later for the coalesced write
         
         # Supported file types
-        self.supported_extensions = {'.txt', '.md', '.pdf', '.docx', '.doc'}
+        self.supported_extensions = frozenset({'.txt', '.md', '.pdf', '.docx', '.doc'})
+
+        # Directories pruned from scans
+        self.skipped_dir_names = set(SKIPPED_DIR_NAMES)
+        self.skip_hidden_dirs = True
         
         # Observer for file monitoring
         self.observer = None
         self.is_monitoring = False
+
+        # Watchdog calls in from its observer thread, hence the lock; the
+        # change task on the event loop drains settled events
+        self.pending_changes: Dict[str, tuple] = {}  # file_path -> ('change' | 'delete', last event monotonic time)
+        self.pending_changes_lock = threading.Lock()
+        self.change_task = None
         
         # Load existing index
         self.load_index_state()
         
+    @property
+    def vector_store(self):
+        """The vector store files are indexed into (owned by the search engine)."""
+        return getattr(self.search_engine, 'vector_store', None)
+
     def load_index_state(self):
-        """Load the state of indexed files."""
+        """Load the state of indexed files by replaying the index log."""
         try:
-            if Path(self.index_file).exists():
-                with open(self.index_file, 'r', encoding='utf-8') as f:
-                    self.indexed_files = json.load(f)
+            if Path(self.index_log).exists():
+                line_count = 0
+                with open(self.index_log, 'rb') as f:
+                    for line in f:
+                        try:
+                            entry = orjson.loads(line)
+                        except orjson.JSONDecodeError:
+                            # Torn line from an interrupted append; rewrite so new appends start clean
+                            self._rewrite_log = True
+                            continue
+                        line_count += 1
+                        if entry['op'] == 'delete':
+                            self.indexed_files.pop(entry['path'], None)
+                        else:
+                            self.indexed_files[entry['path']] = entry['info']
+
+                if line_count > INDEX_LOG_COMPACT_RATIO * max(len(self.indexed_files), 1):
+                    self._rewrite_log = True
                 logger.info(f"📋 Loaded index state: {len(self.indexed_files)} files tracked")
+            elif Path(self.index_file).exists():
+                self.indexed_files = orjson.loads(Path(self.index_file).read_bytes())
+                self._rewrite_log = True
+                logger.info(f"📋 Loaded legacy index state: {len(self.indexed_files)} files tracked")
             else:
                 logger.info("📋 No previous index state found")
         except Exception as e:
             logger.error(f"❌ Error loading index state: {e}")
             self.indexed_files = {}
+
+        if self._rewrite_log:
+            self.index_state_dirty = True
+            self.flush_index_state()
+
+    def record_file_info(self, file_path: str, info: Dict):
+        """Track a file's indexed state."""
+        self.indexed_files[file_path] = info
+        self._pending_log.append({'op': 'upsert', 'path': file_path, 'info': info})
+        self.save_index_state()
+
+    def forget_file(self, file_path: str):
+        """Stop tracking a file."""
+        self.indexed_files.pop(file_path, None)
+        self._pending_log.append({'op': 'delete', 'path': file_path})
+        self.save_index_state()
+
+    def forget_all_files(self):
+        """Stop tracking every file."""
+        self.indexed_files.clear()
+        self._pending_log.clear()
+        self._rewrite_log = True
+        self.save_index_state()
             
     def save_index_state(self):
-        """Save the state of indexed files."""
+        """Mark the index state changed and write it shortly, coalescing bursts of changes."""
+        self.index_state_dirty = True
+        if self._save_handle is not None:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Not on an event loop (e.g. called from a script); write immediately
+            self.flush_index_state()
+            return
+        self._save_handle = loop.call_later(INDEX_STATE_SAVE_DELAY, self.flush_index_state)
+
+    def flush_index_state(self):
+        """Write the state of indexed files now if it has unsaved changes."""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        if not self.index_state_dirty:
+            return
+
+        self.index_state_dirty = False
         try:
-            os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
-            with open(self.index_file, 'w', encoding='utf-8') as f:
-                json.dump(self.indexed_files, f, indent=2)
+            os.makedirs(os.path.dirname(self.index_log), exist_ok=True)
+            if self._rewrite_log or not Path(self.index_log).exists():
+                # Write one upsert per live entry to a temp file and swap it in atomically
+                temp_path = self.index_log + '.tmp'
+                with open(temp_path, 'wb') as f:
+                    f.write(b"".join(
+                        orjson.dumps({'op': 'upsert', 'path': file_path, 'info': info}, option=orjson.OPT_APPEND_NEWLINE)
+                        for file_path, info in self.indexed_files.items()
+                    ))
+                os.replace(temp_path, self.index_log)
+                self._rewrite_log = False
+            else:
+                with open(self.index_log, 'ab') as f:
+                    f.write(b"".join(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE)
+                                     for entry in self._pending_log))
+            self._pending_log.clear()
             logger.debug(f"💾 Saved index state: {len(self.indexed_files)} files")
         except Exception as e:
+            self.index_state_dirty = True  # keep pending entries for the next flush
             logger.error(f"❌ Error saving index state: {e}")
             
-    def get_file_hash(self, file_path: str) -> str:
+    def get_file_hash(self, file_path: str, algorithm: str = FILE_HASH_ALGORITHM) -> str:
         """Get hash of file content for change detection."""
         try:
-            with open(file_path, 'rb') as f:
-                content = f.read()
-                return hashlib.md5(content).hexdigest()
+            hasher = new_hasher(algorithm)
+            buffer = bytearray(HASH_CHUNK_SIZE)
+            view = memoryview(buffer)
+            with open(file_path, 'rb', buffering=0) as f:
+                # Read into one reused buffer instead of allocating a bytes object per chunk
+                while True:
+                    read = f.readinto(buffer)
+                    if not read:
+                        break
+                    hasher.update(view[:read])
+            return hasher.hexdigest()
         except Exception as e:
             logger.error(f"❌ Error hashing file {file_path}: {e}")
             return ""
             
-    def get_file_info(self, file_path: str) -> Dict:
+    def get_file_info(self, file_path: str, algorithm: str = FILE_HASH_ALGORITHM, stat=None) -> Dict:
         """Get file information for tracking."""
         try:
-            stat = os.stat(file_path)
+            stat = stat or os.stat(file_path)
             return {
-                'hash': self.get_file_hash(file_path),
+                'hash': self.get_file_hash(file_path, algorithm),
+                'hash_algorithm': algorithm,
                 'timestamp': stat.st_mtime,
+                'mtime_ns': stat.st_mtime_ns,
                 'size': stat.st_size
             }
         except Exception as e:
             logger.error(f"❌ Error getting file info {file_path}: {e}")
             return {}
             
+    def has_supported_extension(self, file_path: str) -> bool:
+        """Check a file's extension with string operations instead of building a Path."""
+        _, dot, extension = os.path.basename(file_path).rpartition('.')
+        return bool(dot) and dot + extension.lower() in self.supported_extensions
+
     def should_index_file(self, file_path: str) -> bool:
         """Check if file should be indexed."""
-        path = Path(file_path)
-        
         # Check extension
-        if path.suffix.lower() not in self.supported_extensions:
+        if not self.has_supported_extension(file_path):
             return False
             
         # Check if file exists
-        if not path.exists():
+        try:
+            stat = os.stat(file_path)
+        except OSError:
             return False
-            
-        # Check if file has changed
-        current_info = self.get_file_info(file_path)
+
+        return self.needs_indexing(file_path, stat)
+
+    def needs_indexing(self, file_path: str, stat: os.stat_result) -> bool:
+        """Check whether a supported, existing file is new or changed since it was indexed."""
+        # Index if new file or its size changed; no need to read it to know that
+        stored_info = self.indexed_files.get(file_path, {})
+        if not stored_info or stored_info.get('size') != stat.st_size:
+            return True
+
+        # Unchanged modification time: trust it and skip reading the file
+        if 'mtime_ns' in stored_info:
+            if stored_info['mtime_ns'] == stat.st_mtime_ns:
+                return False
+        elif stored_info.get('timestamp') == stat.st_mtime:
+            return False
+
+        # Touched: compare content, hashing with the algorithm the stored entry used
+        algorithm = stored_info.get('hash_algorithm', LEGACY_HASH_ALGORITHM)
+        current_info = self.get_file_info(file_path, algorithm, stat)
         if not current_info:
             return False
-            
-        stored_info = self.indexed_files.get(file_path, {})
-        
-        # Index if new file or changed
-        if (not stored_info or 
-            stored_info.get('hash') != current_info['hash'] or
-            stored_info.get('size') != current_info['size']):
+
+        if stored_info.get('hash') != current_info['hash']:
+            if algorithm == FILE_HASH_ALGORITHM:
+                self.checked_file_info[file_path] = current_info
             return True
-            
+
+        # Same content under a new mtime; remember it so the next check is stat-only
+        self.record_file_info(file_path, current_info)
         return False
         
     async def index_file(self, file_path: str) -> bool:
         """Index a single file."""
+        checked_info = self.checked_file_info.pop(file_path, None)
         try:
             logger.info(f"📄 Indexing: {file_path}")
 
@@ -149,9 +323,8 @@ class AutoIndexer:
                 if hasattr(self.search_engine, 'vector_store'):
                     await self.search_engine.vector_store.add_document(file_path, chunks)
 
-                # Update tracking
-                self.indexed_files[file_path] = self.get_file_info(file_path)
-                self.save_index_state()
+                # Update tracking, reusing the hash should_index_file just computed if any
+                self.record_file_info(file_path, checked_info or self.get_file_info(file_path))
                 logger.info(f"✅ Indexed: {file_path} ({len(chunks)} chunks)")
                 return True
             else:
@@ -162,30 +335,67 @@ class AutoIndexer:
             logger.error(f"❌ Error indexing {file_path}: {e}")
             return False
             
+    def iter_supported_files(self, folder_path: str):
+        """Yield a DirEntry for each supported file under folder_path.
+
+        Pruned directories (see skipped_dir_names) are never opened, and
+        symlinked directories are not followed.
+        """
+        for entry, _ in walk_supported_files(folder_path, self.supported_extensions,
+                                             self.skipped_dir_names, self.skip_hidden_dirs):
+            yield entry
+
+    def list_supported_files(self, folder_path: str) -> List[Tuple[str, os.stat_result]]:
+        """(path, stat) for each supported file under folder_path (blocking, run in a thread)."""
+        listing = []
+        for entry in self.iter_supported_files(folder_path):
+            try:
+                listing.append((entry.path, entry.stat()))
+            except OSError:
+                pass  # removed while walking
+        return listing
+
     async def scan_and_index_folder(self, folder_path: str) -> int:
         """Scan folder and index all files that need indexing."""
+        _, indexed_count = await self._scan_and_index(folder_path)
+        return indexed_count
+
+    async def _scan_and_index(self, folder_path: str, listing=None) -> Tuple[int, int]:
+        """Scan folder, index files that need it, and return (supported files found, files indexed).
+
+        listing is a list_supported_files() result when the caller already walked the folder.
+        """
+        found_count = 0
         indexed_count = 0
         
         if not Path(folder_path).exists():
             logger.warning(f"⚠️ Folder not found: {folder_path}")
-            return 0
+            return 0, 0
             
         logger.info(f"🔍 Scanning folder: {folder_path}")
         
         try:
-            for root, dirs, files in os.walk(folder_path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    
-                    if self.should_index_file(file_path):
-                        success = await self.index_file(file_path)
-                        if success:
-                            indexed_count += 1
+            # Directory enumeration and stats are blocking syscalls; keep them off the event loop
+            if listing is None:
+                listing = await run_io(self.list_supported_files, folder_path)
+            found_count = len(listing)
+            # Listed files are known to exist with a supported extension; only their state needs checking
+            to_index = [file_path for file_path, stat in listing if self.needs_indexing(file_path, stat)]
+
+            # Parsing and embedding run in worker pools, so several files can be in flight at once
+            index_slots = asyncio.Semaphore(INDEX_CONCURRENCY)
+
+            async def index_one(file_path: str) -> bool:
+                async with index_slots:
+                    return await self.index_file(file_path)
+
+            results = await asyncio.gather(*[index_one(file_path) for file_path in to_index])
+            indexed_count = sum(results)
                             
         except Exception as e:
             logger.error(f"❌ Error scanning folder {folder_path}: {e}")
             
-        return indexed_count
+        return found_count, indexed_count
         
     async def initial_indexing(self):
         """Perform initial indexing of all watch folders."""
@@ -198,26 +408,33 @@ class AutoIndexer:
         total_files_found = 0
         total_indexed = 0
 
+        folders = []
         for folder in self.watch_folders:
             if Path(folder).exists():
-                # Count existing files
-                for root, dirs, files in os.walk(folder):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        if Path(file_path).suffix.lower() in self.supported_extensions:
-                            total_files_found += 1
-
-                count = await self.scan_and_index_folder(folder)
-                total_indexed += count
-                logger.info(f"📁 {folder}: {count} files indexed")
+                folders.append(folder)
             else:
                 logger.info(f"📁 {folder}: folder not found, skipping")
 
+        # Walk all watch folders at once in the I/O pool; stat latency dominates on cold or network drives
+        listings = await asyncio.gather(*[run_io(self.list_supported_files, folder) for folder in folders],
+                                        return_exceptions=True)
+
+        for folder, listing in zip(folders, listings):
+            if isinstance(listing, Exception):
+                logger.error(f"❌ Error scanning folder {folder}: {listing}")
+                continue
+            # One walk both counts existing files and indexes the ones that need it
+            found, count = await self._scan_and_index(folder, listing)
+            total_files_found += found
+            total_indexed += count
+            logger.info(f"📁 {folder}: {count} files indexed")
+
         # If no files found anywhere, clear all data
         if total_files_found == 0 and len(self.indexed_files) > 0:
             logger.info("🗑️ No files found in any watch folder, clearing all data...")
             await self.clear_all_data()
 
+        self.flush_index_state()
         logger.info(f"✅ Initial indexing complete: {total_indexed} files indexed")
         return total_indexed
         
@@ -238,6 +455,7 @@ class AutoIndexer:
                     
             self.observer.start()
             self.is_monitoring = True
+            self.change_task = asyncio.get_running_loop().create_task(self.process_settled_changes())
             logger.info("✅ File monitoring started")
             
         except Exception as e:
@@ -250,16 +468,47 @@ class AutoIndexer:
                 self.observer.stop()
                 self.observer.join()
                 self.is_monitoring = False
+                if self.change_task:
+                    self.change_task.cancel()
+                    self.change_task = None
                 logger.info("🛑 File monitoring stopped")
             except Exception as e:
                 logger.error(f"❌ Error stopping file monitoring: {e}")
+
+        # Don't lose changes still waiting for the coalesced write
+        self.flush_index_state()
                 
+    def queue_change(self, file_path: str, kind: str):
+        """Record a file event ('change' or 'delete'); safe to call from watchdog threads.
+
+        Repeated events for a path (editors emit several per save) collapse
+        into one, and the latest kind wins.
+        """
+        with self.pending_changes_lock:
+            self.pending_changes[file_path] = (kind, time.monotonic())
+
+    async def process_settled_changes(self):
+        """Handle file events once their path has been quiet for CHANGE_DEBOUNCE_SECONDS."""
+        while True:
+            await asyncio.sleep(CHANGE_POLL_INTERVAL)
+
+            cutoff = time.monotonic() - CHANGE_DEBOUNCE_SECONDS
+            with self.pending_changes_lock:
+                settled = [(path, kind) for path, (kind, last_seen) in self.pending_changes.items()
+                           if last_seen <= cutoff]
+                for path, _ in settled:
+                    del self.pending_changes[path]
+
+            for file_path, kind in settled:
+                if kind == 'delete':
+                    await self.handle_file_deletion(file_path)
+                else:
+                    await self.handle_file_change(file_path)
+
     async def handle_file_change(self, file_path: str):
         """Handle file change event."""
         try:
-            # Small delay to ensure file is fully written
-            await asyncio.sleep(1)
-
+            # The debounce in process_settled_changes already waited for writes to settle
             if self.should_index_file(file_path):
                 logger.info(f"🔄 File changed, re-indexing: {file_path}")
                 await self.index_file(file_path)
@@ -277,8 +526,7 @@ class AutoIndexer:
                 await self._remove_file_from_database(file_path)
 
                 # Remove from index tracking
-                del self.indexed_files[file_path]
-                self.save_index_state()
+                self.forget_file(file_path)
 
                 logger.info(f"✅ Successfully removed: {file_path}")
             else:
@@ -292,32 +540,40 @@ class AutoIndexer:
         deleted_files = []
 
         for file_path in list(self.indexed_files.keys()):
-            if not Path(file_path).exists():
+            if not os.path.exists(file_path):
                 deleted_files.append(file_path)
 
         if deleted_files:
             logger.info(f"🗑️ Cleaning up {len(deleted_files)} deleted files from index and database")
 
+            # Remove from vector database with batched deletes, falling back to one file at a time
+            removed_in_bulk = False
+            if hasattr(self.vector_store, 'delete_by_sources'):
+                try:
+                    await self.vector_store.delete_by_sources(deleted_files)
+                    removed_in_bulk = True
+                except Exception as e:
+                    logger.warning(f"⚠️ Bulk delete failed, removing files one by one: {e}")
+
             for file_path in deleted_files:
-                # Remove from vector database
-                await self._remove_file_from_database(file_path)
+                if not removed_in_bulk:
+                    await self._remove_file_from_database(file_path)
 
                 # Remove from index tracking
-                del self.indexed_files[file_path]
+                self.forget_file(file_path)
                 logger.info(f"🗑️ Removed: {file_path}")
 
-            self.save_index_state()
             logger.info(f"✅ Cleanup complete: {len(deleted_files)} files removed")
 
     async def _remove_file_from_database(self, file_path: str):
         """Remove all chunks of a file from the vector database."""
         try:
             # Get the vector store
-            vector_store = self.document_processor.vector_store
+            vector_store = self.vector_store
 
-            if hasattr(vector_store, 'delete_document'):
+            if hasattr(vector_store, 'delete_by_sources'):
                 # Use the vector store's delete method
-                await vector_store.delete_document(file_path)
+                await vector_store.delete_by_sources([file_path])
                 logger.debug(f"🗑️ Removed chunks from database: {file_path}")
             elif hasattr(vector_store, 'table') and vector_store.table is not None:
                 # For LanceDB, delete by source filter
@@ -365,7 +621,7 @@ class AutoIndexer:
             logger.info("🗑️ Clearing all indexed data...")
 
             # Clear vector database
-            vector_store = self.document_processor.vector_store
+            vector_store = self.vector_store
             if hasattr(vector_store, 'clear'):
                 await vector_store.clear()
                 logger.info("🗑️ Cleared vector database using clear() method")
@@ -392,8 +648,7 @@ class AutoIndexer:
                 logger.warning("⚠️ Vector store doesn't support clearing")
 
             # Clear index tracking
-            self.indexed_files.clear()
-            self.save_index_state()
+            self.forget_all_files()
 
             logger.info("✅ All data cleared successfully")
 
@@ -436,27 +691,27 @@ class FileChangeHandler(FileSystemEventHandler):
         """Handle file creation."""
         if not event.is_directory:
             logger.info(f"📄 File created: {event.src_path}")
-            asyncio.create_task(self.auto_indexer.handle_file_change(event.src_path))
+            self.auto_indexer.queue_change(event.src_path, 'change')
 
     def on_modified(self, event):
         """Handle file modification."""
         if not event.is_directory:
-            logger.info(f"📝 File modified: {event.src_path}")
-            asyncio.create_task(self.auto_indexer.handle_file_change(event.src_path))
+            logger.debug(f"📝 File modified: {event.src_path}")
+            self.auto_indexer.queue_change(event.src_path, 'change')
 
     def on_deleted(self, event):
         """Handle file deletion."""
         if not event.is_directory:
             logger.info(f"🗑️ File deleted: {event.src_path}")
-            asyncio.create_task(self.auto_indexer.handle_file_deletion(event.src_path))
+            self.auto_indexer.queue_change(event.src_path, 'delete')
 
     def on_moved(self, event):
         """Handle file move/rename."""
         if not event.is_directory:
             logger.info(f"📦 File moved: {event.src_path} → {event.dest_path}")
             # Handle as deletion of old path and creation of new path
-            asyncio.create_task(self.auto_indexer.handle_file_deletion(event.src_path))
-            asyncio.create_task(self.auto_indexer.handle_file_change(event.dest_path))
+            self.auto_indexer.queue_change(event.src_path, 'delete')
+            self.auto_indexer.queue_change(event.dest_path, 'change')
 
 async def main():
     """Test the auto indexer."""
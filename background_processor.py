@@ -9,10 +9,10 @@ import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Callable, Union
-import json
+import orjson
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
 import uuid
 
@@ -31,7 +31,7 @@ class TaskPriority(Enum):
     HIGH = 3
     URGENT = 4
 
-@dataclass
+@dataclass(slots=True)
 class ProcessingTask:
     id: str
     name: str
@@ -357,7 +357,7 @@ class BackgroundProcessor:
             'total_tasks': len(self.tasks),
             'status_counts': status_counts,
             'type_counts': type_counts,
-            'recent_tasks': [asdict(task) for task in self.get_recent_tasks(5)]
+            'recent_tasks': self.get_recent_tasks(5)  # dataclasses; serialized directly by orjson
         }
     
     async def cleanup_old_tasks(self, max_age_hours: int = 24):
@@ -387,11 +387,14 @@ class BackgroundProcessor:
             history = {
                 'exported_at': datetime.now().isoformat(),
                 'statistics': self.get_statistics(),
-                'tasks': [asdict(task) for task in self.tasks.values()]
+                'tasks': list(self.tasks.values())
             }
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(history, f, indent=2, ensure_ascii=False)
+
+            # orjson serializes the task dataclasses and enums directly; serializing
+            # before opening the file means a failure never leaves a truncated export
+            data = orjson.dumps(history, default=str, option=orjson.OPT_INDENT_2)
+            with open(file_path, 'wb') as f:
+                f.write(data)
             
             logger.info(f"📊 Task history exported to {file_path}")
         except Exception as e:
@@ -3,8 +3,13 @@ Citation and Metadata Management System for Semantic Search Assistant.
 Handles citation formatting, metadata preservation, and source tracking.
 """
 
+import asyncio
 import json
 import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Union
@@ -13,8 +18,29 @@ import hashlib
 from urllib.parse import urlparse
 import uuid
 
+import orjson
+
+from response_cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
+YEAR_PATTERN = re.compile(r'\b(19|20)\d{2}\b')
+
+# Saves are coalesced: a burst of creates within this many seconds is written once
+CITATIONS_SAVE_DELAY = 0.5
+
+@lru_cache(maxsize=1024)
+def extract_year(date_string: str) -> str:
+    """Extract a 4-digit year from a date string, or 'n.d.' if there is none."""
+    if not date_string:
+        return 'n.d.'
+
+    year_match = YEAR_PATTERN.search(date_string)
+    if year_match:
+        return year_match.group()
+
+    return 'n.d.'
+
 class CitationManager:
     """Manages citations and metadata for documents and highlights."""
     
@@ -33,6 +59,15 @@ class CitationManager:
         self.citations_db_path = Path(config.get('citation.database_path', 'data/citations.json'))
         self.citations_db_path.parent.mkdir(parents=True, exist_ok=True)
         self.citations_db = self._load_citations_database()
+
+        # Snapshots are serialized and written by one background thread, in
+        # order, so request handlers never wait on serialization or disk I/O
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="citations")
+        self._save_handle = None  # pending loop.call_later for the coalesced save
+
+        # Rendered citations and statistics, dropped whenever the database is saved
+        self._format_cache = TTLCache(maxsize=config.get('citation.format_cache_size', 4096), ttl=3600.0)
+        self._stats_cache = TTLCache(maxsize=1, ttl=30.0)
     
     def _load_citations_database(self) -> Dict[str, Any]:
         """Load the citations database."""
@@ -52,13 +87,57 @@ class CitationManager:
         }
     
     def _save_citations_database(self):
-        """Save the citations database."""
+        """Save the citations database.
+
+        Inside an event loop the save is deferred by CITATIONS_SAVE_DELAY so a
+        burst of changes is written once; otherwise it is flushed right away.
+        """
+        self._format_cache.clear()
+        self._stats_cache.clear()
+        self.citations_db['updated_at'] = datetime.now().isoformat()
+        if self._save_handle is not None:
+            return  # the pending save will pick this change up
+
         try:
-            self.citations_db['updated_at'] = datetime.now().isoformat()
-            with open(self.citations_db_path, 'w', encoding='utf-8') as f:
-                json.dump(self.citations_db, f, indent=2, ensure_ascii=False)
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush_citations_database()
+            return
+        self._save_handle = loop.call_later(CITATIONS_SAVE_DELAY, self.flush_citations_database)
+
+    def flush_citations_database(self):
+        """Hand a snapshot of the database to the writer thread now.
+
+        The snapshot copies only the top-level maps (records are never modified
+        after creation), so later changes cannot race with serialization, which
+        happens on the writer thread.
+        """
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+
+        try:
+            snapshot = {key: dict(value) if isinstance(value, dict) else value
+                        for key, value in self.citations_db.items()}
+            self._writer.submit(self._write_snapshot, snapshot)
         except Exception as e:
             logger.error(f"Error saving citations database: {e}")
+
+    def _write_snapshot(self, snapshot: Dict[str, Any]):
+        """Serialize a snapshot and atomically replace the database file with it (blocking)."""
+        try:
+            data = orjson.dumps(snapshot, option=orjson.OPT_INDENT_2)
+            temp_path = self.citations_db_path.with_suffix('.tmp')
+            temp_path.write_bytes(data)
+            os.replace(temp_path, self.citations_db_path)
+        except Exception as e:
+            logger.error(f"Error writing citations database: {e}")
+
+    def close(self):
+        """Write any pending changes and wait for the writer thread to finish."""
+        if self._save_handle is not None:
+            self.flush_citations_database()
+        self._writer.shutdown(wait=True)
     
     def register_source(self, source_info: Dict[str, Any]) -> str:
         """Register a new source and return its ID."""
@@ -95,36 +174,62 @@ class CitationManager:
     
     def create_citation(self, content: str, source_id: str, **kwargs) -> Dict[str, Any]:
         """Create a citation for content from a source."""
+        citation = self._build_citation(content, source_id, **kwargs)
+        self.citations_db['citations'][citation['id']] = citation
+        self._save_citations_database()
+        
+        return citation
+
+    def create_citations_bulk(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create many citations with a single database save.
+
+        All citations are validated before any is stored, so an unknown
+        source rejects the whole batch.
+        """
+        citations = [self._build_citation(**item) for item in items]
+        for citation in citations:
+            self.citations_db['citations'][citation['id']] = citation
+        if citations:
+            self._save_citations_database()
+        
+        return citations
+
+    def _build_citation(self, content: str, source_id: str, **kwargs) -> Dict[str, Any]:
+        """Build a citation record, checking that its source exists."""
         citation_id = str(uuid.uuid4())
         
         source = self.citations_db['sources'].get(source_id)
         if not source:
             raise ValueError(f"Source {source_id} not found")
         
+        # Small-vocabulary fields repeat across citations; interning shares one string object each
+        now = datetime.now().isoformat()
         citation = {
             'id': citation_id,
             'content': content,
-            'source_id': source_id,
+            'source_id': sys.intern(source_id),
             'page': kwargs.get('page', ''),
             'location': kwargs.get('location', ''),
-            'highlight_color': kwargs.get('highlight_color', ''),
+            'highlight_color': sys.intern(kwargs.get('highlight_color', '')),
             'user_note': kwargs.get('user_note', ''),
-            'tags': kwargs.get('tags', []),
-            'importance': kwargs.get('importance', 'medium'),
+            'tags': [sys.intern(tag) for tag in kwargs.get('tags', [])],
+            'importance': sys.intern(kwargs.get('importance', 'medium')),
             'context': kwargs.get('context', ''),
-            'created_at': datetime.now().isoformat(),
-            'updated_at': datetime.now().isoformat(),
-            'citation_style': kwargs.get('citation_style', self.default_style),
+            'created_at': now,
+            'updated_at': now,
+            'citation_style': sys.intern(kwargs.get('citation_style', self.default_style)),
             'metadata': kwargs.get('metadata', {})
         }
         
-        self.citations_db['citations'][citation_id] = citation
-        self._save_citations_database()
-        
         return citation
     
     def format_citation(self, citation_id: str, style: Optional[str] = None) -> str:
         """Format a citation in the specified style."""
+        cache_key = (citation_id, style)
+        formatted = self._format_cache.get(cache_key)
+        if formatted is not None:
+            return formatted
+
         citation = self.citations_db['citations'].get(citation_id)
         if not citation:
             raise ValueError(f"Citation {citation_id} not found")
@@ -136,7 +241,9 @@ class CitationManager:
         style = style or citation.get('citation_style', self.default_style)
         formatter = self.citation_styles.get(style, self.citation_styles[self.default_style])
         
-        return formatter(source, citation)
+        formatted = formatter(source, citation)
+        self._format_cache.set(cache_key, formatted)
+        return formatted
     
     def format_content_with_citation(self, content: str, citation_id: str, 
                                    style: Optional[str] = None, 
@@ -203,15 +310,7 @@ class CitationManager:
     
     def _extract_year(self, date_string: str) -> str:
         """Extract year from a date string."""
-        if not date_string:
-            return 'n.d.'
-        
-        # Try to extract 4-digit year
-        year_match = re.search(r'\b(19|20)\d{2}\b', date_string)
-        if year_match:
-            return year_match.group()
-        
-        return 'n.d.'
+        return extract_year(date_string)
     
     def _format_apa_citation(self, source: Dict[str, Any], citation: Dict[str, Any]) -> str:
         """Format citation in APA style."""
@@ -347,13 +446,17 @@ class CitationManager:
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get statistics about the citation database."""
-        return {
-            'total_sources': len(self.citations_db['sources']),
-            'total_citations': len(self.citations_db['citations']),
-            'source_types': self._count_source_types(),
-            'citation_styles_used': self._count_citation_styles(),
-            'most_cited_sources': self._get_most_cited_sources()
-        }
+        stats = self._stats_cache.get('stats')
+        if stats is None:
+            stats = {
+                'total_sources': len(self.citations_db['sources']),
+                'total_citations': len(self.citations_db['citations']),
+                'source_types': self._count_source_types(),
+                'citation_styles_used': self._count_citation_styles(),
+                'most_cited_sources': self._get_most_cited_sources()
+            }
+            self._stats_cache.set('stats', stats)
+        return stats
     
     def _count_source_types(self) -> Dict[str, int]:
         """Count sources by type."""
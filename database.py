@@ -19,8 +19,17 @@ import pyarrow as pa
 # Embedding model
 from sentence_transformers import SentenceTransformer
 
+from executors import run_cpu, run_io
+from response_cache import SemanticCache
+
 logger = logging.getLogger(__name__)
 
+# Search results carry a display-ready excerpt so clients don't slice full chunks per redraw
+SNIPPET_LENGTH = 200
+
+# Sources per delete predicate when removing many files at once
+DELETE_SOURCES_BATCH = 256
+
 class VectorStore:
     """LanceDB-based vector store for document embeddings."""
     
@@ -30,6 +39,29 @@ class VectorStore:
         self.table = None
         self.embedding_model = None
         self.embedding_dim = None
+
+        # Product-quantized ANN index (IVF_PQ), built once the table is large enough
+        self.index_min_rows = config.get('vector_store.index_min_rows', 5000)
+        self.index_nprobes = config.get('vector_store.index_nprobes', 20)
+        self.index_refine_factor = config.get('vector_store.index_refine_factor', 5)
+        self.indexed_rows = 0  # row count when the index was last built
+
+        # LanceDB deletes only write deletion files; rows are physically dropped on compaction
+        self.compact_after_deletes = config.get('vector_store.compact_after_deletes', 100)
+        self.deletes_since_compaction = 0
+        self._compaction_task: Optional[asyncio.Task] = None
+        self._index_task: Optional[asyncio.Task] = None
+
+        # Bumped on every insert, delete and clear; response caches key on it so
+        # writes from any path (API, auto indexer, folder manager) invalidate them
+        self.write_generation = 0
+
+        # Near-duplicate queries reuse results instead of hitting the table again
+        self.semantic_cache = SemanticCache(
+            maxsize=config.get('search.semantic_cache.max_entries', 1024),
+            ttl=config.get('search.semantic_cache.ttl_seconds', 300.0),
+            threshold=config.get('search.semantic_cache.threshold', 0.95)
+        )
     
     async def initialize(self):
         """Initialize the vector store and embedding model."""
@@ -52,6 +84,13 @@ class VectorStore:
         try:
             self.table = self.db.open_table(table_name)
             logger.info(f"Connected to existing table: {table_name}")
+
+            # Don't rebuild an ANN index that already exists on disk
+            try:
+                if self.table.list_indices():
+                    self.indexed_rows = self.table.count_rows()
+            except Exception:
+                pass
         except:
             # Create new table with sample data
             schema = self._create_schema()
@@ -141,6 +180,7 @@ class VectorStore:
         
         # Insert into table
         self.table.add(data)
+        await self._after_write()
         
         logger.info(f"Added {len(chunks)} chunks for document: {Path(file_path).name}")
         return document_id
@@ -179,97 +219,226 @@ class VectorStore:
         }]
         
         self.table.add(data)
+        await self._after_write()
         
         logger.info(f"Added Readwise highlight from: {highlight.get('book', 'Unknown')}")
         return highlight_id
     
-    async def _generate_embeddings(self, texts: List[str]) -> np.ndarray:
+    async def _generate_embeddings(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
         """Generate embeddings for a list of texts."""
-        # Run embedding generation in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        embeddings = await loop.run_in_executor(
-            None, 
-            self.embedding_model.encode, 
-            texts
-        )
+        batch_size = batch_size or self.config.get('embedding.batch_size', 32)
+        # Run embedding generation in the shared CPU pool to avoid blocking
+        embeddings = await run_cpu(lambda: self.embedding_model.encode(texts, batch_size=batch_size))
         return embeddings
     
-    async def search(self, query: str, limit: int = 20, similarity_threshold: float = 0.7) -> List[Dict[str, Any]]:
-        """Perform vector similarity search."""
-        # Check if table is empty
+    async def _after_write(self):
+        """Drop cached search results and keep the ANN index current after inserts.
+
+        The index is built in a single background task, so inserts never wait
+        on a rebuild and concurrent writers cannot start duplicate builds.
+        """
+        self.write_generation += 1
+        self.semantic_cache.clear()
+        if self._index_task is None or self._index_task.done():
+            self._index_task = asyncio.create_task(self._maybe_build_vector_index())
+
+    async def _maybe_build_vector_index(self):
+        """Build (or rebuild) the IVF_PQ index when the table has grown enough.
+
+        Product quantization stores each embedding as one byte per sub-vector
+        instead of 4 bytes per dimension, so ANN probes read far less memory.
+        The index is rebuilt whenever the table doubles in size; rows added in
+        between are searched exactly alongside the index.
+        """
+        try:
+            row_count = self.table.count_rows()
+        except Exception:
+            return
+
+        if row_count < self.index_min_rows or row_count < 2 * self.indexed_rows:
+            return
+
+        # 8-dimensional sub-vectors (384-d MiniLM -> 48 bytes per vector)
+        num_sub_vectors = self.embedding_dim // 8 if self.embedding_dim % 8 == 0 else 1
+        num_partitions = max(1, int(row_count ** 0.5))
+
+        try:
+            logger.info(f"Building IVF_PQ index over {row_count} rows "
+                        f"({num_partitions} partitions, {num_sub_vectors} sub-vectors)")
+            await run_cpu(lambda: self.table.create_index(
+                metric="L2",
+                num_partitions=num_partitions,
+                num_sub_vectors=num_sub_vectors,
+                replace=True
+            ))
+            self.indexed_rows = row_count
+        except Exception as e:
+            logger.error(f"Error building vector index: {e}")
+
+    async def _after_delete(self):
+        """Drop cached search results and schedule compaction once enough deletes pile up.
+
+        Deletes stay cheap logical operations; the physical rewrite happens
+        in the background instead of on the request path.
+        """
+        self.write_generation += 1
+        self.semantic_cache.clear()
+        self.deletes_since_compaction += 1
+        if (self.deletes_since_compaction >= self.compact_after_deletes
+                and (self._compaction_task is None or self._compaction_task.done())):
+            self._compaction_task = asyncio.create_task(self.compact())
+
+    async def compact(self) -> bool:
+        """Physically remove deleted rows, merge small data files and prune old versions."""
+        if not self.table:
+            return False
+
+        def run():
+            if hasattr(self.table, 'optimize'):
+                self.table.optimize()
+            else:
+                self.table.compact_files()
+                self.table.cleanup_old_versions()
+
+        try:
+            await run_cpu(run)
+            self.deletes_since_compaction = 0
+            logger.info("Vector store compacted")
+            return True
+        except Exception as e:
+            logger.error(f"Error compacting vector store: {e}")
+            return False
+
+    def _has_rows(self) -> bool:
+        """Check whether the table contains any rows to search."""
         try:
             count = self.table.count_rows()
             if count == 0:
                 logger.info("No documents in vector store yet")
-                return []
+                return False
+            return True
         except Exception as e:
             logger.warning(f"Could not check table count: {e}")
+            return False
+
+    async def search(self, query: str, limit: int = 20, similarity_threshold: float = 0.7) -> List[Dict[str, Any]]:
+        """Perform vector similarity search."""
+        # Check if table is empty
+        if not self._has_rows():
             return []
         
         # Generate query embedding
         query_embedding = await self._generate_embeddings([query])
         
+        return await self._search_by_embedding(query_embedding[0], limit, similarity_threshold)
+
+    async def search_batch(self, queries: List[str], limits: List[int],
+                           similarity_thresholds: List[float]) -> List[List[Dict[str, Any]]]:
+        """Perform vector similarity search for several queries at once.
+
+        All queries are embedded in a single forward pass and the table
+        lookups run concurrently in the shared I/O pool.
+        """
+        if not queries:
+            return []
+
+        if not self._has_rows():
+            return [[] for _ in queries]
+
+        # Generate all query embeddings in one batch
+        query_embeddings = await self._generate_embeddings(queries)
+
+        return await asyncio.gather(*[
+            self._search_by_embedding(embedding, limit, threshold)
+            for embedding, limit, threshold in zip(query_embeddings, limits, similarity_thresholds)
+        ])
+
+    async def _search_by_embedding(self, query_embedding: np.ndarray, limit: int,
+                                   similarity_threshold: float) -> List[Dict[str, Any]]:
+        """Search the table with a precomputed query embedding."""
+        cache_key = (limit, round(similarity_threshold, 3))
+        cached = self.semantic_cache.get(query_embedding, cache_key)
+        if cached is not None:
+            return [dict(result) for result in cached]
+
         # Perform vector search
         try:
-            results = (
-                self.table
-                .search(query_embedding[0])
-                .limit(limit)
-                .to_pandas()
-            )
+            query = self.table.search(query_embedding).limit(limit)
+            if self.indexed_rows:
+                # Probe enough partitions and re-rank with the full-precision
+                # vectors so quantization error doesn't shift similarity scores
+                query = query.nprobes(self.index_nprobes).refine_factor(self.index_refine_factor)
+            # The lookup is synchronous; running it off the event loop keeps the
+            # loop responsive and lets batched lookups overlap
+            results = await run_io(query.to_pandas)
         except Exception as e:
             logger.error(f"Error performing vector search: {e}")
             return []
         
-        # Filter by similarity threshold and format results
+        # Convert LanceDB distances to similarities and apply the threshold
+        # for all candidates at once, so only surviving rows are formatted
+        similarities = self._distances_to_similarities(results)
+        keep = np.flatnonzero(similarities >= similarity_threshold)
+
         formatted_results = []
         seen_content = set()  # Track content we've already seen
+        readwise_boost = self.config.get('readwise.priority_boost', 0)
 
-        for _, row in results.iterrows():
-            # Calculate similarity score (LanceDB returns distance, convert to similarity)
-            distance = row.get('_distance', float('inf'))
-            similarity = 1 / (1 + distance) if distance != float('inf') else 0
+        for similarity, row in zip(similarities[keep].tolist(), results.iloc[keep].to_dict('records')):
+            # Create a content hash for deduplication
+            content = row['content']
+            stripped = content.strip()
+            content_hash = hash(stripped.lower())
             
-            if similarity >= similarity_threshold:
-                # Create a content hash for deduplication
-                content = row['content']
-                content_hash = hash(content.strip().lower())
-                
-                # Skip if we've seen this exact content before
-                if content_hash in seen_content:
-                    continue
-                seen_content.add(content_hash)
-                
-                try:
-                    metadata = json.loads(row['metadata'])
-                except:
-                    metadata = {}
-                
-                # Convert timestamp back to datetime for display
-                created_at = datetime.fromtimestamp(row['created_at']) if row['created_at'] else datetime.now()
-                
-                result = {
-                    'id': row['id'],
-                    'content': content,
-                    'source': row['source'],
-                    'similarity': similarity,
-                    'metadata': metadata,
-                    'is_readwise': row['is_readwise'],
-                    'highlight_color': row.get('highlight_color', ''),
-                    'created_at': created_at
-                }
-                
-                # Apply Readwise boost if configured
-                if row['is_readwise'] and self.config.get('readwise.priority_boost', 0) > 0:
-                    result['similarity'] += self.config.get('readwise.priority_boost')
-                
-                formatted_results.append(result)
+            # Skip if we've seen this exact content before
+            if content_hash in seen_content:
+                continue
+            seen_content.add(content_hash)
+            
+            try:
+                metadata = json.loads(row['metadata'])
+            except:
+                metadata = {}
+            
+            # Convert timestamp back to datetime for display
+            created_at = datetime.fromtimestamp(row['created_at']) if row['created_at'] else datetime.now()
+            
+            result = {
+                'id': row['id'],
+                'content': content,
+                'snippet': stripped if len(stripped) <= SNIPPET_LENGTH else stripped[:SNIPPET_LENGTH] + "...",
+                'source': row['source'],
+                'similarity': similarity,
+                'metadata': metadata,
+                'is_readwise': row['is_readwise'],
+                'highlight_color': row.get('highlight_color', ''),
+                'created_at': created_at
+            }
+            
+            # Apply Readwise boost if configured
+            if row['is_readwise'] and readwise_boost > 0:
+                result['similarity'] += readwise_boost
+            
+            formatted_results.append(result)
         
         # Sort by similarity (descending)
         formatted_results.sort(key=lambda x: x['similarity'], reverse=True)
-        
+
+        self.semantic_cache.set(query_embedding, [dict(result) for result in formatted_results], cache_key)
         return formatted_results
     
+    @staticmethod
+    def _distances_to_similarities(results) -> np.ndarray:
+        """Map LanceDB distances to similarities in [0, 1] (missing distance -> 0)."""
+        if '_distance' not in results:
+            return np.zeros(len(results))
+
+        distances = results['_distance'].to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            similarities = 1.0 / (1.0 + distances)
+        similarities[np.isinf(distances)] = 0.0
+        return similarities
+
     async def get_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector store."""
         try:
@@ -313,14 +482,57 @@ class VectorStore:
                 'embedding_dimension': self.embedding_dim
             }
     
+    @staticmethod
+    def _quote(value: str) -> str:
+        """Quote a string literal for a LanceDB filter expression."""
+        return "'" + value.replace("'", "''") + "'"
+
     async def delete_document(self, document_id: str):
         """Delete all chunks for a document."""
         try:
-            self.table.delete(f"id LIKE '{document_id}%'")
+            self.table.delete(f"id LIKE {self._quote(document_id + '%')}")
+            await self._after_delete()
             logger.info(f"Deleted document: {document_id}")
         except Exception as e:
             logger.error(f"Error deleting document {document_id}: {e}")
 
+    async def delete_documents(self, document_ids: List[str]) -> int:
+        """Delete all chunks for several documents with a single predicate.
+
+        One delete call means one table version and one pass over the data,
+        instead of one per document. Returns the number of chunks deleted.
+        """
+        document_ids = list(dict.fromkeys(document_ids))  # dedupe, keep order
+        if not document_ids or not self.table:
+            return 0
+
+        predicate = ' OR '.join(f"id LIKE {self._quote(doc_id + '%')}" for doc_id in document_ids)
+        initial_count = self.table.count_rows()
+        self.table.delete(predicate)
+        deleted_count = initial_count - self.table.count_rows()
+        await self._after_delete()
+        logger.info(f"Deleted {deleted_count} chunks for {len(document_ids)} documents")
+        return deleted_count
+
+    async def delete_by_sources(self, source_paths: List[str]) -> int:
+        """Delete all chunks for several source files with one IN predicate per batch.
+
+        Deletes are idempotent, so there is no per-path existence probe.
+        Each path is matched as given and with forward slashes.
+        """
+        sources = list(dict.fromkeys(
+            variant for path in source_paths for variant in (path, path.replace('\\', '/'))
+        ))
+        if not sources or not self.table:
+            return 0
+
+        for start in range(0, len(sources), DELETE_SOURCES_BATCH):
+            batch = sources[start:start + DELETE_SOURCES_BATCH]
+            self.table.delete(f"source IN ({', '.join(self._quote(source) for source in batch)})")
+        await self._after_delete()
+        logger.info(f"Deleted chunks for {len(source_paths)} sources")
+        return len(source_paths)
+
     async def delete_by_source(self, source_path: str):
         """Delete all chunks for a specific source file."""
         try:
@@ -348,6 +560,7 @@ class VectorStore:
                     df = self.table.search().where(condition).limit(10).to_pandas()
                     if not df.empty:
                         self.table.delete(condition)
+                        await self._after_delete()
                         deleted_count += len(df)
                         logger.info(f"🗑️ Deleted {len(df)} chunks with condition: {condition}")
                         break
@@ -414,6 +627,10 @@ class VectorStore:
 
                 # Recreate the table
                 await self._create_table()
+                self.indexed_rows = 0
+                self.deletes_since_compaction = 0
+                self.write_generation += 1
+                self.semantic_cache.clear()
 
                 logger.info("Vector store cleared successfully")
         except Exception as e:
@@ -425,33 +642,56 @@ class VectorStore:
         try:
             # Generate embedding
             embeddings = await self._generate_embeddings([content])
-            embedding = embeddings[0]
-
-            # Create document record
-            doc_id = metadata.get('highlight_id', f"doc_{int(time.time() * 1000)}")
-
-            record = {
-                'id': doc_id,
-                'content': content,
-                'embedding': embedding,
-                'source': metadata.get('source', 'unknown'),
-                'title': metadata.get('book', metadata.get('title', 'Untitled')),
-                'is_readwise': metadata.get('source_type') == 'readwise',
-                'created_at': datetime.now().isoformat(),
-                'file_size': len(content),
-                'file_type': 'highlight' if metadata.get('source_type') == 'readwise' else 'document',
-                'metadata': json.dumps(metadata)
-            }
+            record = self._single_document_record(content, metadata, embeddings[0])
 
             # Add to table
             self.table.add([record])
+            await self._after_write()
 
-            logger.info(f"Added document: {doc_id}")
+            logger.info(f"Added document: {record['id']}")
 
         except Exception as e:
             logger.error(f"Error adding document: {e}")
             raise
 
+    async def add_documents_batch(self, contents: List[str], metadatas: List[Dict[str, Any]]):
+        """Add several single documents with one embedding pass and one table insert."""
+        if not contents:
+            return
+
+        try:
+            # Encode the whole batch in one forward pass
+            embeddings = await self._generate_embeddings(contents, batch_size=len(contents))
+            records = [
+                self._single_document_record(content, metadata, embedding)
+                for content, metadata, embedding in zip(contents, metadatas, embeddings)
+            ]
+
+            self.table.add(records)
+            await self._after_write()
+
+            logger.info(f"Added {len(records)} documents")
+
+        except Exception as e:
+            logger.error(f"Error adding documents: {e}")
+            raise
+
+    def _single_document_record(self, content: str, metadata: Dict[str, Any], embedding) -> Dict[str, Any]:
+        """Build the table record for a document added via add_single_document/add_documents_batch."""
+        doc_id = metadata.get('highlight_id', f"doc_{int(time.time() * 1000)}")
+        return {
+            'id': doc_id,
+            'content': content,
+            'embedding': embedding,
+            'source': metadata.get('source', 'unknown'),
+            'title': metadata.get('book', metadata.get('title', 'Untitled')),
+            'is_readwise': metadata.get('source_type') == 'readwise',
+            'created_at': datetime.now().isoformat(),
+            'file_size': len(content),
+            'file_type': 'highlight' if metadata.get('source_type') == 'readwise' else 'document',
+            'metadata': json.dumps(metadata)
+        }
+
     async def close(self):
         """Close the vector store connection."""
         if self.db:
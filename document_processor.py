@@ -5,12 +5,14 @@ Supports PDF, DOCX, Markdown, and plain text files.
 
 import asyncio
 import logging
+import os
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import hashlib
 import mimetypes
 import json
 import uuid
+import orjson
 from datetime import datetime
 # Document processing libraries
 import PyPDF2
@@ -23,6 +25,8 @@ from bs4 import BeautifulSoup
 import re
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+from executors import run_cpu, run_io
+
 logger = logging.getLogger(__name__)
 
 class DocumentChunk:
@@ -58,6 +62,8 @@ class DocumentProcessor:
             '.md': self._process_markdown,
             '.txt': self._process_text
         }
+        # Serializes read-modify-write of each .annotations.json file
+        self._annotation_locks: Dict[Path, asyncio.Lock] = {}
     
     async def initialize(self):
         """Initialize the document processor."""
@@ -104,21 +110,22 @@ class DocumentProcessor:
             raise ValueError(f"No processor for file type: {extension}")
         
         # Base metadata
+        stat = file_path.stat()
         metadata = {
             'source': str(file_path),
             'filename': file_path.name,
             'extension': extension,
-            'file_size': file_path.stat().st_size,
-            'modified_time': file_path.stat().st_mtime
+            'file_size': stat.st_size,
+            'modified_time': stat.st_mtime
         }
         
-        # Extract content using appropriate processor
-        content, extra_metadata = await processor(file_path)
+        # Parsers are blocking (PyMuPDF, python-docx, markdown), so run them in the CPU pool
+        content, extra_metadata = await run_cpu(processor, file_path)
         metadata.update(extra_metadata)
         
         return content, metadata
     
-    async def _process_pdf(self, file_path: Path) -> tuple[str, Dict[str, Any]]:
+    def _process_pdf(self, file_path: Path) -> tuple[str, Dict[str, Any]]:
         """Process PDF file and extract text with advanced highlight detection."""
         content = ""
         metadata = {
@@ -170,7 +177,7 @@ class DocumentProcessor:
             logger.error(f"Error processing PDF {file_path}: {str(e)}")
             # Fallback to PyPDF2 if PyMuPDF fails
             try:
-                content, fallback_metadata = await self._process_pdf_fallback(file_path)
+                content, fallback_metadata = self._process_pdf_fallback(file_path)
                 metadata.update(fallback_metadata)
             except Exception as fallback_error:
                 logger.error(f"Fallback PDF processing also failed: {fallback_error}")
@@ -338,16 +345,48 @@ class DocumentProcessor:
         except:
             return "unknown"
 
+    @staticmethod
+    def annotations_path(file_path: str) -> Path:
+        """Path of the sidecar file holding a document's user annotations."""
+        return Path(file_path).with_suffix('.annotations.json')
+
+    async def get_annotations_version(self, file_path: str) -> str:
+        """Cheap version token for a document's annotations; changes whenever the file is rewritten."""
+        def stat_version() -> str:
+            try:
+                stat = os.stat(self.annotations_path(file_path))
+            except FileNotFoundError:
+                return "none"
+            return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+        return await run_io(stat_version)
+
+    @staticmethod
+    def _load_annotations(annotations_file: Path) -> Optional[List[Dict[str, Any]]]:
+        """Read an annotations file, or None if it does not exist (blocking)."""
+        try:
+            with open(annotations_file, 'rb') as f:
+                return orjson.loads(f.read())
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _save_annotations(annotations_file: Path, user_annotations: List[Dict[str, Any]]):
+        """Write an annotations file (blocking)."""
+        with open(annotations_file, 'w', encoding='utf-8') as f:
+            json.dump(user_annotations, f, indent=2, ensure_ascii=False)
+
+    def _annotation_lock(self, annotations_file: Path) -> asyncio.Lock:
+        """Get the lock guarding an annotations file."""
+        lock = self._annotation_locks.get(annotations_file)
+        if lock is None:
+            lock = self._annotation_locks[annotations_file] = asyncio.Lock()
+        return lock
+
     async def add_user_annotation(self, file_path: str, page_num: int, annotation_data: Dict[str, Any]) -> bool:
         """Add user annotation/highlight with metadata to a document."""
         try:
-            # Load user annotations from storage
-            annotations_file = Path(file_path).with_suffix('.annotations.json')
-            user_annotations = []
-
-            if annotations_file.exists():
-                with open(annotations_file, 'r', encoding='utf-8') as f:
-                    user_annotations = json.load(f)
+            annotations_file = self.annotations_path(file_path)
 
             # Create new annotation
             new_annotation = {
@@ -368,11 +407,12 @@ class DocumentProcessor:
                 'metadata': annotation_data.get('metadata', {})
             }
 
-            user_annotations.append(new_annotation)
+            async with self._annotation_lock(annotations_file):
+                user_annotations = await run_io(self._load_annotations, annotations_file) or []
+                user_annotations.append(new_annotation)
 
-            # Save annotations
-            with open(annotations_file, 'w', encoding='utf-8') as f:
-                json.dump(user_annotations, f, indent=2, ensure_ascii=False)
+                # Save annotations
+                await run_io(self._save_annotations, annotations_file, user_annotations)
 
             logger.info(f"Added user annotation to {file_path}, page {page_num}")
             return True
@@ -384,13 +424,8 @@ class DocumentProcessor:
     async def get_user_annotations(self, file_path: str) -> List[Dict[str, Any]]:
         """Get all user annotations for a document."""
         try:
-            annotations_file = Path(file_path).with_suffix('.annotations.json')
-
-            if not annotations_file.exists():
-                return []
-
-            with open(annotations_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            annotations_file = self.annotations_path(file_path)
+            return await run_io(self._load_annotations, annotations_file) or []
 
         except Exception as e:
             logger.error(f"Error loading user annotations: {e}")
@@ -399,26 +434,24 @@ class DocumentProcessor:
     async def update_user_annotation(self, file_path: str, annotation_id: str, updates: Dict[str, Any]) -> bool:
         """Update an existing user annotation."""
         try:
-            annotations_file = Path(file_path).with_suffix('.annotations.json')
-
-            if not annotations_file.exists():
-                return False
-
-            with open(annotations_file, 'r', encoding='utf-8') as f:
-                user_annotations = json.load(f)
-
-            # Find and update annotation
-            for annotation in user_annotations:
-                if annotation['id'] == annotation_id:
-                    annotation.update(updates)
-                    annotation['modified_at'] = datetime.now().isoformat()
-                    break
-            else:
-                return False
+            annotations_file = self.annotations_path(file_path)
+
+            async with self._annotation_lock(annotations_file):
+                user_annotations = await run_io(self._load_annotations, annotations_file)
+                if user_annotations is None:
+                    return False
+
+                # Find and update annotation
+                for annotation in user_annotations:
+                    if annotation['id'] == annotation_id:
+                        annotation.update(updates)
+                        annotation['modified_at'] = datetime.now().isoformat()
+                        break
+                else:
+                    return False
 
-            # Save updated annotations
-            with open(annotations_file, 'w', encoding='utf-8') as f:
-                json.dump(user_annotations, f, indent=2, ensure_ascii=False)
+                # Save updated annotations
+                await run_io(self._save_annotations, annotations_file, user_annotations)
 
             logger.info(f"Updated user annotation {annotation_id} in {file_path}")
             return True
@@ -430,24 +463,22 @@ class DocumentProcessor:
     async def delete_user_annotation(self, file_path: str, annotation_id: str) -> bool:
         """Delete a user annotation."""
         try:
-            annotations_file = Path(file_path).with_suffix('.annotations.json')
-
-            if not annotations_file.exists():
-                return False
+            annotations_file = self.annotations_path(file_path)
 
-            with open(annotations_file, 'r', encoding='utf-8') as f:
-                user_annotations = json.load(f)
+            async with self._annotation_lock(annotations_file):
+                user_annotations = await run_io(self._load_annotations, annotations_file)
+                if user_annotations is None:
+                    return False
 
-            # Filter out the annotation to delete
-            original_count = len(user_annotations)
-            user_annotations = [a for a in user_annotations if a['id'] != annotation_id]
+                # Filter out the annotation to delete
+                original_count = len(user_annotations)
+                user_annotations = [a for a in user_annotations if a['id'] != annotation_id]
 
-            if len(user_annotations) == original_count:
-                return False  # Annotation not found
+                if len(user_annotations) == original_count:
+                    return False  # Annotation not found
 
-            # Save updated annotations
-            with open(annotations_file, 'w', encoding='utf-8') as f:
-                json.dump(user_annotations, f, indent=2, ensure_ascii=False)
+                # Save updated annotations
+                await run_io(self._save_annotations, annotations_file, user_annotations)
 
             logger.info(f"Deleted user annotation {annotation_id} from {file_path}")
             return True
@@ -456,7 +487,7 @@ class DocumentProcessor:
             logger.error(f"Error deleting user annotation: {e}")
             return False
 
-    async def _process_pdf_fallback(self, file_path: Path) -> tuple[str, Dict[str, Any]]:
+    def _process_pdf_fallback(self, file_path: Path) -> tuple[str, Dict[str, Any]]:
         """Fallback PDF processing using PyPDF2 when PyMuPDF fails."""
         content = ""
         metadata = {'pages': 0, 'highlights': [], 'annotations': []}
@@ -485,7 +516,7 @@ class DocumentProcessor:
 
         return content.strip(), metadata
     
-    async def _process_docx(self, file_path: Path) -> tuple[str, Dict[str, Any]]:
+    def _process_docx(self, file_path: Path) -> tuple[str, Dict[str, Any]]:
         """Process DOCX file and extract text."""
         try:
             doc = Document(file_path)
@@ -510,7 +541,7 @@ class DocumentProcessor:
             logger.error(f"Error processing DOCX {file_path}: {str(e)}")
             raise
     
-    async def _process_markdown(self, file_path: Path) -> tuple[str, Dict[str, Any]]:
+    def _process_markdown(self, file_path: Path) -> tuple[str, Dict[str, Any]]:
         """Process Markdown file and extract text."""
         try:
             with open(file_path, 'r', encoding='utf-8') as file:
@@ -534,7 +565,7 @@ class DocumentProcessor:
             logger.error(f"Error processing Markdown {file_path}: {str(e)}")
             raise
     
-    async def _process_text(self, file_path: Path) -> tuple[str, Dict[str, Any]]:
+    def _process_text(self, file_path: Path) -> tuple[str, Dict[str, Any]]:
         """Process plain text file."""
         try:
             with open(file_path, 'r', encoding='utf-8') as file:
@@ -576,8 +607,8 @@ class DocumentProcessor:
         """Split content into chunks."""
         if not content.strip():
             return []
-        # Split text into chunks
-        text_chunks = self.text_splitter.split_text(content)
+        # Split text into chunks (off the event loop)
+        text_chunks = await run_cpu(self.text_splitter.split_text, content)
         # Create DocumentChunk objects
         chunks = []
         for i, chunk_text in enumerate(text_chunks):
@@ -596,8 +627,8 @@ class DocumentProcessor:
         if not self.text_splitter:
             await self.initialize()
 
-        # Split text into chunks
-        text_chunks = self.text_splitter.split_text(text)
+        # Split text into chunks (off the event loop)
+        text_chunks = await run_cpu(self.text_splitter.split_text, text)
 
         chunks = []
         for i, chunk_text in enumerate(text_chunks):
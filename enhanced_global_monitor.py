@@ -6,17 +6,24 @@ Ensures typing detection works with Word and all applications.
 
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import sys
 import os
+import queue
+import re
+import string
 import subprocess
 import ctypes
 import webbrowser
 from pathlib import Path
-from typing import List, Dict, Any
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
 import tkinter as tk
 from tkinter import ttk, messagebox
+import orjson
 import requests
+import requests.adapters
 
 # Try multiple monitoring approaches
 try:
@@ -66,6 +73,26 @@ except ImportError:
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Wait this long after the last keystroke before searching, so a typed word costs one request
+SEARCH_DEBOUNCE_MS = 120
+
+# Text detected on the keyboard and clipboard threads is picked up by the Tk thread this often
+DETECTED_TEXT_POLL_MS = 50
+
+# Key names that extend the current word; other single characters fall back to str.isalnum()
+ASCII_WORD_CHARACTERS = frozenset(string.ascii_letters + string.digits)
+
+# Backend startup: give up after this long; readiness probes back off from the first to the last delay
+BACKEND_START_TIMEOUT = 30.0  # seconds
+BACKEND_PROBE_DELAYS = (0.1, 1.0)  # seconds
+
+# Drop targets: window classes of known text editors, or titles naming one
+TEXT_APP_CLASS_PATTERN = re.compile('|'.join(map(re.escape, [
+    'WordPadClass', 'OpusApp', 'Notepad', 'Chrome_WidgetWin_1',
+    'HwndWrapper', 'ApplicationFrameWindow', 'Window'])))
+TEXT_APP_TITLE_PATTERN = re.compile('word|notepad|code|editor|text', re.IGNORECASE)
+PDF_APP_PATTERN = re.compile('adobe|acrobat|reader|pdf|foxit|sumatra', re.IGNORECASE)
+
 class EnhancedGlobalMonitor:
     """Enhanced global monitor with multiple detection methods."""
     
@@ -75,6 +102,14 @@ class EnhancedGlobalMonitor:
         self.current_word = ""
         self.last_clipboard = ""
         self.monitor_thread = None
+
+        # Typed characters mark the word dirty; a flush thread reports it at most every interval.
+        # The lock keeps the word, its generation and the reports made from it in order across threads.
+        self._word_lock = threading.Lock()
+        self._word_generation = 0  # bumped on every change to current_word
+        self._dirty = False
+        self._flush_interval = 0.05  # seconds (<= 20 callbacks per second)
+        self._flush_thread = None
         
     def start_monitoring(self):
         """Start monitoring with multiple methods."""
@@ -95,6 +130,8 @@ class EnhancedGlobalMonitor:
             try:
                 keyboard.on_press(self._on_key_press)
                 self.is_monitoring = True
+                self._flush_thread = threading.Thread(target=self._flush_typed_word, daemon=True)
+                self._flush_thread.start()
                 success = True
                 logger.info("✅ Keyboard monitoring started")
             except Exception as e:
@@ -143,25 +180,49 @@ class EnhancedGlobalMonitor:
             
             # Handle spacebar - clear search
             if key_name == 'space':
-                if self.current_word.strip():
-                    self.current_word = ""
-                    self.callback("")
+                with self._word_lock:
+                    if self.current_word.strip():
+                        self.current_word = ""
+                        self._word_generation += 1
+                        self._dirty = False
+                        self.callback("")
                 return
                 
             # Handle backspace
             elif key_name == 'backspace':
-                if self.current_word:
-                    self.current_word = self.current_word[:-1]
-                    self.callback(self.current_word)
+                with self._word_lock:
+                    if self.current_word:
+                        self.current_word = self.current_word[:-1]
+                        self._word_generation += 1
+                        self._dirty = False
+                        self.callback(self.current_word)
                 return
                 
-            # Handle regular characters
-            elif len(key_name) == 1 and key_name.isalnum():
-                self.current_word += key_name
-                self.callback(self.current_word)
+            # Handle regular characters; reported by _flush_typed_word
+            elif key_name in ASCII_WORD_CHARACTERS or (len(key_name) == 1 and key_name.isalnum()):
+                with self._word_lock:
+                    self.current_word += key_name
+                    self._word_generation += 1
+                    self._dirty = True
                 
         except Exception as e:
             logger.error(f"Key press error: {e}")
+
+    def _flush_typed_word(self):
+        """Report the current word once per flush interval while typing, so a burst of keys costs one callback."""
+        reported_generation = 0
+        while self.is_monitoring:
+            time.sleep(self._flush_interval)
+            with self._word_lock:
+                # A space or backspace since the last key already reported a newer word
+                if not self._dirty or self._word_generation == reported_generation:
+                    continue
+                self._dirty = False
+                reported_generation = self._word_generation
+                try:
+                    self.callback(self.current_word)
+                except Exception as e:
+                    logger.error(f"Typed word callback error: {e}")
             
     def _clipboard_monitor(self):
         """Monitor clipboard for text changes (backup method)."""
@@ -179,8 +240,11 @@ class EnhancedGlobalMonitor:
                         if self.last_clipboard and current_clipboard.startswith(self.last_clipboard):
                             new_text = current_clipboard[len(self.last_clipboard):].strip()
                             if new_text and len(new_text) < 20:  # Single word
-                                self.current_word = new_text
-                                self.callback(new_text)
+                                with self._word_lock:
+                                    self.current_word = new_text
+                                    self._word_generation += 1
+                                    self._dirty = False
+                                    self.callback(new_text)
                         
                         self.last_clipboard = current_clipboard
                         
@@ -194,34 +258,65 @@ class SimpleSearchAPI:
     
     def __init__(self):
         self.base_url = "http://127.0.0.1:8000"
+
+        # One pooled keep-alive connection set for all requests to the local backend
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.session.mount("http://", adapter)
+        self.session.headers["Content-Type"] = "application/json"
+
+        # Backspacing and retyping repeats recent queries; answer those locally for a moment
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()  # query -> (expires_at, results)
+        self._cache_lock = threading.Lock()
+        self._cache_max = 256
+        self._cache_ttl = 2.0
         
     def search(self, query: str) -> List[Dict[str, Any]]:
         """Search for query."""
         if not query.strip():
             return []
 
+        with self._cache_lock:
+            cached = self._cache.get(query)
+            if cached is not None:
+                expires_at, results = cached
+                if expires_at >= time.monotonic():
+                    self._cache.move_to_end(query)
+                    return results
+                del self._cache[query]
+
+        results = self._search_backend(query)
+        if results is not None:
+            with self._cache_lock:
+                self._cache[query] = (time.monotonic() + self._cache_ttl, results)
+                while len(self._cache) > self._cache_max:
+                    self._cache.popitem(last=False)
+        return results or []
+
+    def _search_backend(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Query the backend; returns None when the request failed."""
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/search",
-                json={"query": query, "limit": 10, "similarity_threshold": 0.1},
-                timeout=3
+                data=orjson.dumps({"query": query, "limit": 10, "similarity_threshold": 0.1}),
+                timeout=(0.5, 3)  # (connect, read): the backend is local, so fail fast if it is down
             )
 
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 results = data.get("results", [])
                 # Filter results with score > 30% for better relevance
                 filtered_results = [r for r in results if r.get('similarity', 0) > 0.3]
                 return filtered_results if filtered_results else results[:5]  # Show top 5 if no high-score results
-            return []
+            return None
         except Exception as e:
             logger.error(f"Search API error: {e}")
-            return []
+            return None
             
     def check_backend(self) -> bool:
         """Check if backend is running."""
         try:
-            response = requests.get(f"{self.base_url}/health", timeout=2)
+            response = self.session.get(f"{self.base_url}/health", timeout=(0.5, 2))
             return response.status_code == 200
         except:
             return False
@@ -239,7 +334,9 @@ class EnhancedGlobalApp:
         self.root.attributes('-topmost', True)
         
         # Components
-        self.monitor = EnhancedGlobalMonitor(self.on_text_detected)
+        # The monitor reports from its own threads; Tk is only touched from the Tk thread
+        self._detected_text = queue.SimpleQueue()
+        self.monitor = EnhancedGlobalMonitor(self._detected_text.put)
         self.search_api = SimpleSearchAPI()
 
         # Initialize highlight capture
@@ -251,13 +348,26 @@ class EnhancedGlobalApp:
         # State
         self.is_monitoring = False
         self.current_query = ""
+        self._search_generation = 0  # bumped on every text change; searches from older generations are stale
         self.search_results = []
+        self._rendered_results = None  # (id, similarity) of each result currently drawn
+        self._pending_search_after_id = None  # Tk timer for the debounced search
+        # One long-lived worker runs searches in order instead of a new thread per query
+        self.search_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search")
+        # Backend health checks and startup share a small pool too, off the Tk thread
+        self.background_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="background")
+        self.closing = threading.Event()  # set on close so pooled waits end instead of delaying exit
+        # Parsed high-priority highlights with their lowercased search fields, reloaded when the file changes
+        self._priority_highlights = (None, [])  # ((mtime_ns, size), [(highlight, text, tags, notes)])
         
         # Create GUI
         self.create_widgets()
         
         # Check backend
         self.check_backend()
+
+        # Pick up text detected by the monitor threads
+        self.root.after(DETECTED_TEXT_POLL_MS, self._poll_detected_text)
         
         # Bind close
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -346,6 +456,7 @@ class EnhancedGlobalApp:
         scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.results_text.yview)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.results_text.configure(yscrollcommand=scrollbar.set)
+        self._configure_result_styles()
 
         # Remove double-click functionality - only drag-and-drop now
         self.results_text.bind('<Button-3>', self.show_context_menu)  # Right-click menu
@@ -363,6 +474,8 @@ class EnhancedGlobalApp:
         self.drag_window = None
         self.target_window = None
         self.mouse_tracking_active = False
+        self._hover_target = (None, None, False)  # (hwnd, title, is_text_app) of the last window checked
+        self._foreground_class = (None, '')  # (hwnd, class name) of the last foreground window checked
         
         # Professional status message
         self.results_text.insert(tk.END, "Ready for semantic search. Start monitoring to begin.\n\n")
@@ -374,8 +487,17 @@ class EnhancedGlobalApp:
             self.results_text.insert(tk.END, "⚠️ Highlight capture unavailable. Install: pip install keyboard pyperclip pywin32\n\n")
 
     def check_backend(self):
-        """Check backend status."""
-        if self.search_api.check_backend():
+        """Check backend status in the background so a slow probe never blocks the window."""
+        self.background_executor.submit(self._check_backend_background)
+
+    def _check_backend_background(self):
+        """Probe the backend and report the result on the Tk thread."""
+        running = self.search_api.check_backend()
+        self.root.after(0, lambda: self._show_backend_status(running))
+
+    def _show_backend_status(self, running: bool):
+        """Update the backend indicators."""
+        if running:
             self.backend_status.config(text="✅ Running", foreground="green")
             self.start_backend_btn.config(text="✅ Backend Running")
             self.start_monitor_btn.config(state="normal")
@@ -387,19 +509,27 @@ class EnhancedGlobalApp:
         self.start_backend_btn.config(text="Starting...", state="disabled")
         self.backend_status.config(text="🔄 Starting...", foreground="orange")
         
-        threading.Thread(target=self._start_backend_process, daemon=True).start()
+        self.background_executor.submit(self._start_backend_process)
         
     def _start_backend_process(self):
-        """Start backend process."""
+        """Start backend process and wait until it answers, or exits."""
         try:
-            subprocess.Popen([sys.executable, "start_backend.py"], cwd=Path(__file__).parent)
-            
-            for i in range(30):
-                time.sleep(1)
+            process = subprocess.Popen([sys.executable, "start_backend.py"], cwd=Path(__file__).parent)
+
+            delay, max_delay = BACKEND_PROBE_DELAYS
+            deadline = time.monotonic() + BACKEND_START_TIMEOUT
+            while time.monotonic() < deadline:
+                if self.closing.wait(delay):
+                    return
                 if self.search_api.check_backend():
                     self.root.after(0, self.on_backend_started)
                     return
-                    
+                # A backend that died during startup will never answer; report it now
+                if process.poll() is not None:
+                    logger.error(f"Backend exited during startup with code {process.returncode}")
+                    break
+                delay = min(delay * 2, max_delay)
+
             self.root.after(0, self.on_backend_failed)
             
         except Exception as e:
@@ -625,12 +755,15 @@ class EnhancedGlobalApp:
         try:
             import win32gui
             hwnd = win32gui.GetForegroundWindow()
-            window_title = win32gui.GetWindowText(hwnd).lower()
-            class_name = win32gui.GetClassName(hwnd).lower()
+            if PDF_APP_PATTERN.search(win32gui.GetWindowText(hwnd)):
+                return True
 
-            pdf_indicators = ['adobe', 'acrobat', 'reader', 'pdf', 'foxit', 'sumatra']
-            return any(indicator in window_title or indicator in class_name
-                      for indicator in pdf_indicators)
+            # A window's class never changes, so only look it up when focus moves
+            cached_hwnd, class_name = self._foreground_class
+            if hwnd != cached_hwnd:
+                class_name = win32gui.GetClassName(hwnd)
+                self._foreground_class = (hwnd, class_name)
+            return bool(PDF_APP_PATTERN.search(class_name))
         except:
             return False
 
@@ -1037,9 +1170,37 @@ class EnhancedGlobalApp:
 
 
 
+    def _poll_detected_text(self):
+        """Hand text queued by the monitor threads to on_text_detected on the Tk thread.
+
+        Only the latest text of each poll matters: it supersedes the words
+        queued before it, so a burst of updates costs one display refresh.
+        """
+        latest = None
+        try:
+            while True:
+                latest = self._detected_text.get_nowait()
+        except queue.Empty:
+            pass
+
+        if latest is not None:
+            try:
+                self.on_text_detected(latest)
+            except Exception as e:
+                logger.error(f"Text detection error: {e}")
+
+        if not self.closing.is_set():
+            self.root.after(DETECTED_TEXT_POLL_MS, self._poll_detected_text)
+
     def on_text_detected(self, text: str):
-        """Handle text detected from monitoring."""
+        """Handle text detected from monitoring (Tk thread only)."""
         self.current_query = text
+        self._search_generation += 1
+
+        # A newer keystroke supersedes any search still waiting to fire
+        if self._pending_search_after_id is not None:
+            self.root.after_cancel(self._pending_search_after_id)
+            self._pending_search_after_id = None
         
         # Update display
         if text:
@@ -1048,14 +1209,27 @@ class EnhancedGlobalApp:
             self.current_word_display.config(text="(cleared - ready for next word)", foreground="green")
             self.results_text.delete(1.0, tk.END)
             self.results_text.insert(tk.END, "Search cleared. Start typing for new search...\n")
+            self._rendered_results = None
             return
             
-        # Search
+        # Search once typing pauses
         if len(text) >= 1:
-            threading.Thread(target=self._search_background, args=(text,), daemon=True).start()
+            self._pending_search_after_id = self.root.after(SEARCH_DEBOUNCE_MS, self._dispatch_search, text,
+                                                          self._search_generation)
+
+    def _dispatch_search(self, query: str, generation: int):
+        """Start the background search for a query that survived the debounce window."""
+        self._pending_search_after_id = None
+        if generation != self._search_generation:
+            return
+        self.search_executor.submit(self._search_background, query, generation)
             
-    def _search_background(self, query: str):
+    def _search_background(self, query: str, generation: int):
         """Search in background with priority highlights first."""
+        # Skip queries the user typed past while an earlier search was running
+        if generation != self._search_generation:
+            return
+
         try:
             # Get regular search results
             results = self.search_api.search(query)
@@ -1066,64 +1240,42 @@ class EnhancedGlobalApp:
             # Combine results with priority highlights first
             combined_results = priority_highlights + results
 
-            self.root.after(0, lambda: self._update_results(query, combined_results))
+            self.root.after(0, lambda: self._update_results(query, combined_results, generation))
         except Exception as e:
             logger.error(f"Search error: {e}")
 
     def _search_priority_highlights(self, query: str):
         """Search through saved priority highlights."""
         try:
-            import json
-            from pathlib import Path
-
-            highlights_dir = Path("highlights")
-            if not highlights_dir.exists():
-                return []
-
-            master_file = highlights_dir / "all_highlights.jsonl"
-            if not master_file.exists():
-                return []
-
             matching_highlights = []
             query_lower = query.lower()
 
-            with open(master_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    try:
-                        highlight = json.loads(line.strip())
-
-                        # Only include high priority highlights
-                        if highlight.get('priority') != 'high':
-                            continue
-
-                        # Check if query matches text, tags, or notes
-                        text_match = query_lower in highlight.get('text', '').lower()
-                        tags_match = any(query_lower in tag.lower() for tag in highlight.get('tags', []))
-                        notes_match = query_lower in highlight.get('notes', '').lower()
-
-                        if text_match or tags_match or notes_match:
-                            # Convert to search result format
-                            search_result = {
-                                'id': highlight['id'],
-                                'content': highlight['text'],
-                                'source': f"📌 Priority Highlight from {highlight['source']['window_title']}",
-                                'similarity': 1.0,  # High similarity for exact matches
-                                'is_priority_highlight': True,
-                                'tags': highlight.get('tags', []),
-                                'notes': highlight.get('notes', ''),
-                                'created_at': highlight.get('created_at'),
-                                'metadata': {
-                                    'type': 'priority_highlight',
-                                    'source_app': highlight['source']['window_title'],
-                                    'tags': highlight.get('tags', []),
-                                    'notes': highlight.get('notes', ''),
-                                    'priority': True
-                                }
-                            }
-                            matching_highlights.append(search_result)
-
-                    except json.JSONDecodeError:
-                        continue
+            for highlight, text_lower, tags_lower, notes_lower in self._load_priority_highlights():
+                # Check if query matches text, tags, or notes
+                text_match = query_lower in text_lower
+                tags_match = any(query_lower in tag for tag in tags_lower)
+                notes_match = query_lower in notes_lower
+
+                if text_match or tags_match or notes_match:
+                    # Convert to search result format
+                    search_result = {
+                        'id': highlight['id'],
+                        'content': highlight['text'],
+                        'source': f"📌 Priority Highlight from {highlight['source']['window_title']}",
+                        'similarity': 1.0,  # High similarity for exact matches
+                        'is_priority_highlight': True,
+                        'tags': highlight.get('tags', []),
+                        'notes': highlight.get('notes', ''),
+                        'created_at': highlight.get('created_at'),
+                        'metadata': {
+                            'type': 'priority_highlight',
+                            'source_app': highlight['source']['window_title'],
+                            'tags': highlight.get('tags', []),
+                            'notes': highlight.get('notes', ''),
+                            'priority': True
+                        }
+                    }
+                    matching_highlights.append(search_result)
 
             # Sort by creation date (newest first)
             matching_highlights.sort(key=lambda x: x.get('created_at', ''), reverse=True)
@@ -1134,13 +1286,60 @@ class EnhancedGlobalApp:
         except Exception as e:
             logger.error(f"Search priority highlights error: {e}")
             return []
+
+    def _load_priority_highlights(self):
+        """High-priority highlights from the master file, parsed only when the file has changed."""
+        import json
+
+        master_file = Path("highlights") / "all_highlights.jsonl"
+        try:
+            stat = master_file.stat()
+        except OSError:
+            return []
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached_signature, highlights = self._priority_highlights
+        if signature == cached_signature:
+            return highlights
+
+        highlights = []
+        with open(master_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    highlight = json.loads(line.strip())
+                except json.JSONDecodeError:
+                    continue
+
+                # Only include high priority highlights
+                if highlight.get('priority') != 'high':
+                    continue
+
+                highlights.append((
+                    highlight,
+                    highlight.get('text', '').lower(),
+                    [tag.lower() for tag in highlight.get('tags', [])],
+                    highlight.get('notes', '').lower(),
+                ))
+
+        self._priority_highlights = (signature, highlights)
+        return highlights
             
-    def _update_results(self, query: str, results: List[Dict[str, Any]]):
+    def _update_results(self, query: str, results: List[Dict[str, Any]], generation: int):
         """Update search results with copyable chunks."""
-        if query != self.current_query:
+        # A newer keystroke has already superseded this search, even if it typed the same text again
+        if generation != self._search_generation:
             return
 
         self.search_results = results
+
+        # Typing further often returns the same results; then only the query in the header changes
+        signature = tuple((result.get('id'), result.get('similarity')) for result in results)
+        if results and signature == self._rendered_results:
+            self.results_text.delete("1.0", "1.end")
+            self.results_text.insert("1.0", f"🔍 '{query}'", "header")
+            return
+        self._rendered_results = signature
+
         self.results_text.delete(1.0, tk.END)
 
         if not results:
@@ -1158,7 +1357,6 @@ class EnhancedGlobalApp:
 
         # Results with elegant formatting
         for i, result in enumerate(results, 1):
-            content = result.get('content', '').strip()
             source = result.get('source', 'Unknown').replace('\\', '/')
             similarity = result.get('similarity', 0) * 100
 
@@ -1194,7 +1392,7 @@ class EnhancedGlobalApp:
                 self.results_text.insert(tk.END, "│ ", "priority_border")
 
                 # Full content for priority highlights (no truncation)
-                self.results_text.insert(tk.END, content, "priority_content")
+                self.results_text.insert(tk.END, result.get('content', '').strip(), "priority_content")
                 chunk_end = self.results_text.index(tk.INSERT)
                 self.results_text.insert(tk.END, "\n└" + "─" * 50 + "\n\n", "priority_border")
 
@@ -1216,10 +1414,11 @@ class EnhancedGlobalApp:
                 chunk_start = self.results_text.index(tk.INSERT)
                 self.results_text.insert(tk.END, "│ ", "card_border")
 
-                # Truncate long content for regular results
-                display_content = content
-                if len(content) > 200:
-                    display_content = content[:200] + "..."
+                # Regular results show the backend's precomputed excerpt
+                display_content = result.get('snippet')
+                if display_content is None:
+                    content = result.get('content', '').strip()
+                    display_content = content[:200] + "..." if len(content) > 200 else content
 
                 self.results_text.insert(tk.END, display_content, "content")
                 chunk_end = self.results_text.index(tk.INSERT)
@@ -1231,7 +1430,11 @@ class EnhancedGlobalApp:
                 self.results_text.tag_config(f"chunk_{i}", background="#f0f8ff", relief="raised",
                                            borderwidth=1, lmargin1=20, lmargin2=20)
 
-        # Configure elegant text styles
+        self.results_text.see(1.0)
+
+    def _configure_result_styles(self):
+        """Define the text tags used to draw results once, instead of on every update."""
+        # Elegant text styles
         self.results_text.tag_config("header", font=('Arial', 14, 'bold'), foreground='#1e40af')
         self.results_text.tag_config("card_header", font=('Arial', 11, 'bold'), foreground='#374151')
         self.results_text.tag_config("score", font=('Arial', 10, 'bold'), foreground='#059669')
@@ -1251,10 +1454,6 @@ class EnhancedGlobalApp:
         self.results_text.tag_config("no_results", font=('Arial', 11), foreground='#6b7280')
         self.results_text.tag_config("tips", font=('Arial', 10, 'bold'), foreground='#1e40af')
 
-        self.results_text.see(1.0)
-
-
-
     def on_mouse_motion(self, event):
         """Handle mouse motion to change cursor when over chunks."""
         try:
@@ -1618,14 +1817,17 @@ class EnhancedGlobalApp:
                     if target_hwnd != our_hwnd:
                         # This is an external window
                         try:
-                            class_name = win32gui.GetClassName(target_hwnd)
                             window_title = win32gui.GetWindowText(target_hwnd)
 
-                            # Check if it's a text editor
-                            text_apps = ['WordPadClass', 'OpusApp', 'Notepad', 'Chrome_WidgetWin_1',
-                                       'HwndWrapper', 'ApplicationFrameWindow', 'Window']
+                            # Check if it's a text editor; reuse the answer while the pointer stays on the same window
+                            cached_hwnd, cached_title, is_text_app = self._hover_target
+                            if target_hwnd != cached_hwnd or window_title != cached_title:
+                                class_name = win32gui.GetClassName(target_hwnd)
+                                is_text_app = bool(TEXT_APP_CLASS_PATTERN.search(class_name) or
+                                                   TEXT_APP_TITLE_PATTERN.search(window_title))
+                                self._hover_target = (target_hwnd, window_title, is_text_app)
 
-                            if any(app in class_name for app in text_apps) or any(keyword in window_title.lower() for keyword in ['word', 'notepad', 'code', 'editor', 'text']):
+                            if is_text_app:
                                 # Activate this window immediately
                                 win32gui.SetForegroundWindow(target_hwnd)
 
@@ -1730,6 +1932,9 @@ class EnhancedGlobalApp:
         """Handle closing."""
         if self.is_monitoring:
             self.monitor.stop_monitoring()
+        self.closing.set()
+        self.search_executor.shutdown(wait=False, cancel_futures=True)
+        self.background_executor.shutdown(wait=False, cancel_futures=True)
         self.root.destroy()
         
     def run(self):
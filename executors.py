@@ -0,0 +1,28 @@
+"""
+Shared thread pools for blocking work.
+Syscall-bound I/O and CPU-bound work (chunking, embedding) use separate pools
+so file operations never queue behind model inference.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+IO_MAX_WORKERS = 64
+
+# Threads are started on demand, so creating the pools at import time is cheap
+io_executor = ThreadPoolExecutor(max_workers=IO_MAX_WORKERS, thread_name_prefix="io")
+cpu_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="cpu")
+
+async def run_io(func, *args):
+    """Run a blocking I/O call in the shared I/O pool."""
+    return await asyncio.get_running_loop().run_in_executor(io_executor, func, *args)
+
+async def run_cpu(func, *args):
+    """Run a CPU-bound call in the shared CPU pool."""
+    return await asyncio.get_running_loop().run_in_executor(cpu_executor, func, *args)
+
+def shutdown_executors():
+    """Stop both pools without waiting for queued work."""
+    io_executor.shutdown(wait=False, cancel_futures=True)
+    cpu_executor.shutdown(wait=False, cancel_futures=True)
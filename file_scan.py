@@ -0,0 +1,38 @@
+"""
+Directory walking shared by folder scans, the folder manager and the auto indexer.
+Uses os.scandir so file type checks come from the directory listing instead of
+building a Path and stat-ing every entry.
+"""
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+def walk_supported_files(folder_path: str, supported_extensions: frozenset,
+                         skipped_dir_names: frozenset = frozenset(), skip_hidden_dirs: bool = False):
+    """Yield (DirEntry, extension) for files under folder_path with a supported extension.
+
+    supported_extensions holds lowercase dotted extensions. Directories named in
+    skipped_dir_names (and dot-prefixed ones when skip_hidden_dirs is set) are
+    never opened, symlinked directories are not followed (avoiding cycles) while
+    symlinked files are still yielded, and unreadable directories are logged
+    and skipped.
+    """
+    pending_dirs = [folder_path]
+    while pending_dirs:
+        try:
+            with os.scandir(pending_dirs.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        name = entry.name
+                        if name in skipped_dir_names or (skip_hidden_dirs and name.startswith('.')):
+                            continue
+                        pending_dirs.append(entry.path)
+                    elif entry.is_file():
+                        _, dot, extension = entry.name.rpartition('.')
+                        extension = dot + extension.lower()
+                        if dot and extension in supported_extensions:
+                            yield entry, extension
+        except OSError as e:
+            logger.warning(f"Error scanning directory: {e}")
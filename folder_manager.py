@@ -13,9 +13,12 @@ import hashlib
 import time
 from datetime import datetime
 import threading
+from collections import deque
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+from file_scan import walk_supported_files
+
 logger = logging.getLogger(__name__)
 
 class DocumentFolderHandler(FileSystemEventHandler):
@@ -38,6 +41,64 @@ class DocumentFolderHandler(FileSystemEventHandler):
         if not event.is_directory:
             self.folder_manager.queue_file_for_removal(event.src_path)
 
+class StatusBroadcast:
+    """Append-only ring of status notifications shared by all SSE subscribers.
+
+    Publishing appends once and wakes every waiting subscriber with a single
+    Event; each subscriber keeps its own cursor into the ring. Safe to publish
+    from watchdog threads.
+    """
+
+    def __init__(self, maxlen: int = 1024):
+        self.updates = deque(maxlen=maxlen)  # (seq, notification)
+        self.seq = 0
+        self._lock = threading.Lock()
+        self._event = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def publish(self, notification: Dict[str, Any]):
+        """Append a notification and wake subscribers."""
+        with self._lock:
+            self.seq += 1
+            self.updates.append((self.seq, notification))
+
+        loop = self._loop
+        if loop is None:
+            return  # nobody has subscribed yet
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._wake()
+        else:
+            loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        event, self._event = self._event, asyncio.Event()
+        event.set()
+
+    def cursor(self) -> int:
+        """Position of the latest notification; new subscribers start here."""
+        self._loop = asyncio.get_running_loop()
+        return self.seq
+
+    def since(self, cursor: int):
+        """Return notifications after cursor and the new cursor position."""
+        updates = [(seq, notification) for seq, notification in list(self.updates) if seq > cursor]
+        if not updates:
+            return [], cursor
+        return [notification for _, notification in updates], updates[-1][0]
+
+    async def wait(self, cursor: int, timeout: float):
+        """Wait for notifications after cursor; returns ([], cursor) on timeout."""
+        if self.seq == cursor:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return [], cursor
+        return self.since(cursor)
+
 class FolderManager:
     """Manages folder connections and automatic document processing."""
 
@@ -47,10 +108,16 @@ class FolderManager:
         self.connected_folders = set()
         self.folder_observers = {}
         self.processing_queue = asyncio.Queue()
+        # File change events coalesce here until the file has been quiet for
+        # debounce_seconds, so a burst of saves triggers one reprocess.
+        # Watchdog calls in from its observer threads, hence the lock.
+        self.pending_changes: Dict[str, tuple] = {}  # file_path -> (trigger, last event monotonic time)
+        self.pending_changes_lock = threading.Lock()
+        self.debounce_seconds = config.get('folders.debounce_seconds', 0.5)
         self.removal_queue = asyncio.Queue()
         self.processed_files = {}  # file_path -> {hash, last_modified, status}
         self.indexing_status = {}  # file_path -> {status, progress, started_at, completed_at, error}
-        self.status_subscribers = []  # List of queues for real-time status updates
+        self.status_broadcast = StatusBroadcast()  # Real-time status updates for SSE subscribers
         self.is_monitoring = False
         self.processing_task = None
         
@@ -59,7 +126,7 @@ class FolderManager:
         self.load_connected_folders()
         
         # Supported file extensions
-        self.supported_extensions = set(config.get('processing.supported_extensions', [
+        self.supported_extensions = frozenset(ext.lower() for ext in config.get('processing.supported_extensions', [
             '.pdf', '.docx', '.md', '.txt', '.doc', '.rtf'
         ]))
         
@@ -172,73 +239,78 @@ class FolderManager:
             logger.error(f"Failed to remove folder {folder_path}: {e}")
             return {'success': False, 'error': str(e)}
     
+    def iter_supported_files(self, folder_path: str):
+        """Yield (DirEntry, extension) for supported files under folder_path."""
+        return walk_supported_files(folder_path, self.supported_extensions)
+
     async def scan_folder(self, folder_path: str) -> List[Dict[str, Any]]:
         """Scan a folder for documents and return file information."""
         discovered_files = []
         
         try:
-            folder_path = Path(folder_path)
+            folder_path = str(folder_path)
+            prefix_len = len(os.path.join(folder_path, ''))  # entry paths are folder + separator + relative path
             
             # Recursively find all supported files
-            for file_path in folder_path.rglob('*'):
-                if file_path.is_file() and file_path.suffix.lower() in self.supported_extensions:
-                    try:
-                        stat = file_path.stat()
-                        file_info = {
-                            'path': str(file_path),
-                            'name': file_path.name,
-                            'size': stat.st_size,
-                            'modified': stat.st_mtime,
-                            'extension': file_path.suffix.lower(),
-                            'relative_path': str(file_path.relative_to(folder_path))
-                        }
-                        
-                        # Check if file needs processing
-                        needs_processing = self.file_needs_processing(str(file_path), stat.st_mtime)
-                        file_info['needs_processing'] = needs_processing
-
-                        # Add indexing status to file info
-                        indexing_status = self.get_indexing_status(str(file_path))
-                        file_info['indexing_status'] = indexing_status.get('status', 'unknown')
-                        file_info['indexing_progress'] = indexing_status.get('progress', 0.0)
-                        file_info['indexing_error'] = indexing_status.get('error')
-
-                        if needs_processing:
-                            # Set initial status and queue for processing
-                            self.set_indexing_status(str(file_path), 'pending', progress=0.0)
-                            try:
-                                self.processing_queue.put_nowait({
-                                    'file_path': str(file_path),
-                                    'action': 'process',
-                                    'priority': 'normal'
-                                })
-                            except Exception as e:
-                                logger.warning(f"Failed to queue file {file_path}: {e}")
-                        elif str(file_path) in self.processed_files:
-                            # File is already processed, set status based on processing result
-                            processed_info = self.processed_files[str(file_path)]
-                            if processed_info.get('status') == 'success':
-                                self.set_indexing_status(str(file_path), 'indexed', progress=100.0)
-                            else:
-                                self.set_indexing_status(str(file_path), 'failed', progress=100.0,
-                                                       error=processed_info.get('error', 'Processing failed'))
+            for entry, extension in self.iter_supported_files(folder_path):
+                file_path = entry.path
+                try:
+                    stat = entry.stat()
+                    file_info = {
+                        'path': file_path,
+                        'name': entry.name,
+                        'size': stat.st_size,
+                        'modified': stat.st_mtime,
+                        'extension': extension,
+                        'relative_path': file_path[prefix_len:]
+                    }
+                    
+                    # Check if file needs processing
+                    needs_processing = self.file_needs_processing(file_path, stat.st_mtime)
+                    file_info['needs_processing'] = needs_processing
+
+                    # Add indexing status to file info
+                    indexing_status = self.get_indexing_status(file_path)
+                    file_info['indexing_status'] = indexing_status.get('status', 'unknown')
+                    file_info['indexing_progress'] = indexing_status.get('progress', 0.0)
+                    file_info['indexing_error'] = indexing_status.get('error')
+
+                    if needs_processing:
+                        # Set initial status and queue for processing
+                        self.set_indexing_status(file_path, 'pending', progress=0.0)
+                        try:
+                            self.processing_queue.put_nowait({
+                                'file_path': file_path,
+                                'action': 'process',
+                                'priority': 'normal'
+                            })
+                        except Exception as e:
+                            logger.warning(f"Failed to queue file {file_path}: {e}")
+                    elif file_path in self.processed_files:
+                        # File is already processed, set status based on processing result
+                        processed_info = self.processed_files[file_path]
+                        if processed_info.get('status') == 'success':
+                            self.set_indexing_status(file_path, 'indexed', progress=100.0)
                         else:
-                            # File has never been processed, mark as needing processing
-                            self.set_indexing_status(str(file_path), 'pending', progress=0.0)
-                            try:
-                                self.processing_queue.put_nowait({
-                                    'file_path': str(file_path),
-                                    'action': 'process',
-                                    'priority': 'normal'
-                                })
-                            except Exception as e:
-                                logger.warning(f"Failed to queue file {file_path}: {e}")
-                        
-                        discovered_files.append(file_info)
-                        
-                    except Exception as e:
-                        logger.warning(f"Error processing file {file_path}: {e}")
-                        
+                            self.set_indexing_status(file_path, 'failed', progress=100.0,
+                                                   error=processed_info.get('error', 'Processing failed'))
+                    else:
+                        # File has never been processed, mark as needing processing
+                        self.set_indexing_status(file_path, 'pending', progress=0.0)
+                        try:
+                            self.processing_queue.put_nowait({
+                                'file_path': file_path,
+                                'action': 'process',
+                                'priority': 'normal'
+                            })
+                        except Exception as e:
+                            logger.warning(f"Failed to queue file {file_path}: {e}")
+                    
+                    discovered_files.append(file_info)
+                    
+                except Exception as e:
+                    logger.warning(f"Error processing file {file_path}: {e}")
+                    
         except Exception as e:
             logger.error(f"Error scanning folder {folder_path}: {e}")
         
@@ -262,23 +334,37 @@ class FolderManager:
         return False
     
     def queue_file_for_processing(self, file_path: str, action: str):
-        """Queue a file for processing (called by file system events)."""
+        """Queue a file for processing (called by file system events).
+
+        Repeated events for the same file within the debounce window collapse
+        into one entry; it reaches the processing queue once the file settles.
+        """
         if Path(file_path).suffix.lower() in self.supported_extensions:
-            try:
+            with self.pending_changes_lock:
+                already_pending = file_path in self.pending_changes
+                self.pending_changes[file_path] = (action, time.monotonic())
+
+            if not already_pending:
                 # Set initial status
                 self.set_indexing_status(file_path, 'pending', progress=0.0)
-
-                # Use put_nowait to avoid async issues
-                self.processing_queue.put_nowait({
-                    'file_path': file_path,
-                    'action': 'process',
-                    'priority': 'high',  # Real-time changes get high priority
-                    'trigger': action
-                })
                 logger.info(f"Queued file for processing: {file_path} (trigger: {action})")
-            except Exception as e:
-                self.set_indexing_status(file_path, 'failed', error=f"Failed to queue: {e}")
-                logger.warning(f"Failed to queue file for processing: {e}")
+
+    def flush_settled_changes(self):
+        """Move debounced file changes that have been quiet long enough onto the processing queue."""
+        cutoff = time.monotonic() - self.debounce_seconds
+        with self.pending_changes_lock:
+            settled = [(path, trigger) for path, (trigger, last_seen) in self.pending_changes.items()
+                       if last_seen <= cutoff]
+            for path, _ in settled:
+                del self.pending_changes[path]
+
+        for file_path, trigger in settled:
+            self.processing_queue.put_nowait({
+                'file_path': file_path,
+                'action': 'process',
+                'priority': 'high',  # Real-time changes get high priority
+                'trigger': trigger
+            })
     
     def queue_file_for_removal(self, file_path: str):
         """Queue a file for removal from the vector store."""
@@ -318,15 +404,6 @@ class FolderManager:
             return self.indexing_status.get(file_path, {'status': 'unknown'})
         return self.indexing_status.copy()
 
-    def add_status_subscriber(self, queue: asyncio.Queue):
-        """Add a subscriber for real-time status updates."""
-        self.status_subscribers.append(queue)
-
-    def remove_status_subscriber(self, queue: asyncio.Queue):
-        """Remove a status subscriber."""
-        if queue in self.status_subscribers:
-            self.status_subscribers.remove(queue)
-
     def notify_status_subscribers(self, file_path: str, status_data: Dict[str, Any]):
         """Notify all subscribers about status changes."""
         notification = {
@@ -336,17 +413,7 @@ class FolderManager:
             'timestamp': time.time()
         }
 
-        # Remove closed queues and notify active ones
-        active_subscribers = []
-        for queue in self.status_subscribers:
-            try:
-                queue.put_nowait(notification)
-                active_subscribers.append(queue)
-            except:
-                # Queue is closed or full, remove it
-                pass
-
-        self.status_subscribers = active_subscribers
+        self.status_broadcast.publish(notification)
     
     async def start_monitoring(self):
         """Start folder monitoring and background processing."""
@@ -432,14 +499,15 @@ class FolderManager:
 
     async def process_queued_files(self):
         """Process files from the processing queue."""
-        batch = []
+        self.flush_settled_changes()
+        batch = {}  # file_path -> item; a file queued twice is processed once
 
         # Collect a batch of files to process
         try:
             while len(batch) < self.batch_size:
                 try:
                     item = await asyncio.wait_for(self.processing_queue.get(), timeout=0.1)
-                    batch.append(item)
+                    batch.setdefault(item['file_path'], item)
                 except asyncio.TimeoutError:
                     break
         except Exception as e:
@@ -449,7 +517,7 @@ class FolderManager:
             return
 
         # Process the batch
-        for item in batch:
+        for item in batch.values():
             await self.process_single_file(item)
 
     async def process_single_file(self, item: Dict[str, Any]):
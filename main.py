@@ -31,6 +31,12 @@ logger = logging.getLogger(__name__)
 
 class DocumentSearchBackend:
     """Main backend class that orchestrates all components."""
+
+    # Components are fixed at construction; slots make the per-request lookups plain offsets
+    __slots__ = (
+        'config', 'document_processor', 'vector_store', 'readwise_importer', 'search_engine',
+        'folder_manager', 'citation_manager', 'background_processor', 'auto_indexer'
+    )
     
     def __init__(self, config_path: str = "config.json"):
         self.config = Config(config_path)
@@ -207,54 +213,79 @@ class DocumentSearchBackend:
             return {'error': str(e)}
 
     async def process_documents(self, file_paths: List[str], progress_callback=None):
-        """Process multiple documents and add them to the vector store."""
+        """Process multiple documents and add them to the vector store.
+
+        Embedding and storage happen one file at a time, in order, while the
+        next processing.parallel_files files are parsed ahead. The window only
+        advances as files are consumed, so parsed chunks never pile up for the
+        whole batch, and its default (half the CPUs) leaves CPU pool workers
+        free for query embeddings.
+        """
         results = []
         total_files = len(file_paths)
+        read_ahead = max(1, self.config.get('processing.parallel_files', max(1, (os.cpu_count() or 1) // 2)))
+        parsing = {}  # file index -> parse future, for the files inside the read-ahead window
+
+        def schedule_parse(index: int):
+            if index < total_files and Path(file_paths[index]).exists():
+                parsing[index] = asyncio.ensure_future(self.document_processor.process_file(file_paths[index]))
+
+        for index in range(min(read_ahead, total_files)):
+            schedule_parse(index)
         
-        for i, file_path in enumerate(file_paths):
-            try:
-                logger.info(f"Processing document {i+1}/{total_files}: {file_path}")
+        try:
+            for i, file_path in enumerate(file_paths):
+                parsed = parsing.pop(i, None)
+                schedule_parse(i + read_ahead)
+                try:
+                    logger.info(f"Processing document {i+1}/{total_files}: {file_path}")
+                
+                    # Check if file exists
+                    if parsed is None:
+                        logger.warning(f"File not found: {file_path}")
+                        results.append({
+                            'file_path': file_path,
+                            'error': 'File not found',
+                            'status': 'error'
+                        })
+                        continue
+                
+                    # Process document
+                    chunks = await parsed
+                    logger.info(f"Processed {file_path}: {len(chunks)} chunks, type: {type(chunks)}")
+                    if chunks:
+                        logger.info(f"First chunk type: {type(chunks[0])}, has content: {hasattr(chunks[0], 'content') if chunks else 'N/A'}")
+
+                    # Generate embeddings and store
+                    document_id = await self.vector_store.add_document(file_path, chunks)
                 
-                # Check if file exists
-                if not Path(file_path).exists():
-                    logger.warning(f"File not found: {file_path}")
                     results.append({
                         'file_path': file_path,
-                        'error': 'File not found',
-                        'status': 'error'
+                        'document_id': document_id,
+                        'chunks_count': len(chunks),
+                        'status': 'success',
+                        'chunks': chunks  # Include chunks for query generation
                     })
-                    continue
-                
-                # Process document
-                chunks = await self.document_processor.process_file(file_path)
-                logger.info(f"Processed {file_path}: {len(chunks)} chunks, type: {type(chunks)}")
-                if chunks:
-                    logger.info(f"First chunk type: {type(chunks[0])}, has content: {hasattr(chunks[0], 'content') if chunks else 'N/A'}")
-
-                # Generate embeddings and store
-                document_id = await self.vector_store.add_document(file_path, chunks)
-                
-                results.append({
-                    'file_path': file_path,
-                    'document_id': document_id,
-                    'chunks_count': len(chunks),
-                    'status': 'success',
-                    'chunks': chunks  # Include chunks for query generation
-                })
                 
-                # Report progress
-                if progress_callback:
-                    progress = (i + 1) / total_files * 100
-                    await progress_callback(progress, f"Processed {Path(file_path).name}")
+                    # Report progress
+                    if progress_callback:
+                        progress = (i + 1) / total_files * 100
+                        await progress_callback(progress, f"Processed {Path(file_path).name}")
                     
-            except Exception as e:
-                logger.error(f"Error processing {file_path}: {str(e)}")
-                results.append({
-                    'file_path': file_path,
-                    'error': str(e),
-                    'status': 'error'
-                })
-                
+                except Exception as e:
+                    logger.error(f"Error processing {file_path}: {str(e)}")
+                    results.append({
+                        'file_path': file_path,
+                        'error': str(e),
+                        'status': 'error'
+                    })
+
+        finally:
+            # Don't leave parses running if processing is cancelled part-way
+            for pending in parsing.values():
+                if not pending.done():
+                    pending.cancel()
+
         return results
     
     async def import_readwise_data(self, markdown_content: str, progress_callback=None):
@@ -305,6 +336,22 @@ class DocumentSearchBackend:
             logger.error(f"Error performing search: {str(e)}")
             raise
     
+    async def search_batch(self, queries: List[str], limits: List[int], similarity_thresholds: List[float]):
+        """Perform semantic search for several queries with a single embedding pass."""
+        try:
+            results = await self.search_engine.search_batch(
+                queries=queries,
+                limits=limits,
+                similarity_thresholds=similarity_thresholds
+            )
+            
+            logger.info(f"Batch search for {len(queries)} queries returned {sum(len(r) for r in results)} results")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error performing batch search: {str(e)}")
+            raise
+    
     async def get_stats(self):
         """Get statistics about indexed documents."""
         return await self.vector_store.get_stats()
@@ -382,6 +429,7 @@ class DocumentSearchBackend:
     
     async def cleanup(self):
         """Cleanup resources."""
+        self.citation_manager.close()
         await self.vector_store.close()
 
 # Example usage and testing
@@ -20,15 +20,8 @@ class ReadwiseImporter:
         
     async def parse_markdown(self, markdown_content: str) -> List[Dict[str, Any]]:
         """Parse Readwise markdown export and extract highlights."""
-        highlights = []
-        
         try:
-            # Split content by books/articles
-            books = self._split_by_books(markdown_content)
-            
-            for book_content in books:
-                book_highlights = await self._parse_book_highlights(book_content)
-                highlights.extend(book_highlights)
+            highlights = [highlight async for highlight in self.iter_highlights(markdown_content)]
             
             logger.info(f"Parsed {len(highlights)} highlights from Readwise export")
             return highlights
@@ -37,20 +30,28 @@ class ReadwiseImporter:
             logger.error(f"Error parsing Readwise markdown: {str(e)}")
             raise
     
+    async def iter_highlights(self, markdown_content: str):
+        """Yield highlights one book at a time instead of building the full list."""
+        for book_content in self._iter_books(markdown_content):
+            for highlight in await self._parse_book_highlights(book_content):
+                yield highlight
+
     def _split_by_books(self, content: str) -> List[str]:
         """Split markdown content by books/articles."""
-        # Readwise exports typically use ## for book titles
-        book_sections = re.split(r'^## ', content, flags=re.MULTILINE)
-        
-        # Remove empty sections and add back the ## prefix
-        books = []
-        for i, section in enumerate(book_sections):
-            if section.strip():
-                if i > 0:  # Add back the ## prefix (except for first section which might be metadata)
-                    section = "## " + section
-                books.append(section)
-        
-        return books
+        return list(self._iter_books(content))
+
+    def _iter_books(self, content: str):
+        """Yield non-empty book/article sections of the markdown content."""
+        # Readwise exports typically use ## for book titles; the first section
+        # (before any title) might be metadata
+        start, body_start = 0, 0
+        for match in re.finditer(r'^## ', content, flags=re.MULTILINE):
+            if content[body_start:match.start()].strip():
+                yield content[start:match.start()]
+            start, body_start = match.start(), match.end()
+
+        if content[body_start:].strip():
+            yield content[start:]
     
     async def _parse_book_highlights(self, book_content: str) -> List[Dict[str, Any]]:
         """Parse highlights from a single book section."""
@@ -0,0 +1,151 @@
+"""
+In-process response caching for the API server.
+Provides a small LRU cache with per-entry expiry, a semantic cache keyed by
+query embedding, and ETag helpers.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+import numpy as np
+
+class TTLCache:
+    """LRU cache whose entries expire after a fixed time-to-live.
+
+    Not thread-safe: intended to be used from the event loop only.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a cached value, or default if missing or expired."""
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Cache a value, evicting the least recently used entries if full."""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached entries."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class SemanticCache:
+    """Cache keyed by embedding similarity: near-duplicate queries share results.
+
+    Entries live in a preallocated matrix of unit vectors, so a lookup is one
+    matrix-vector product. An exact-match key (e.g. limit and threshold) must
+    also agree. The least recently used slot is reused when full.
+    Not thread-safe: intended to be used from the event loop only.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, threshold: float = 0.95):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self._vectors: Optional[np.ndarray] = None  # (maxsize, dim), allocated on first set
+        self._keys: list = [None] * maxsize
+        self._values: list = [None] * maxsize
+        self._expires = np.zeros(maxsize)
+        self._last_used = np.zeros(maxsize)
+        self._size = 0
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def get(self, vector, key: Hashable = None, default: Any = None) -> Any:
+        """Get the value cached for the most similar query above the threshold."""
+        if not self._size:
+            return default
+
+        now = time.monotonic()
+        scores = self._vectors[:self._size] @ self._normalize(vector)
+        scores[self._expires[:self._size] < now] = -1.0
+
+        candidates = np.flatnonzero(scores >= self.threshold)
+        for slot in candidates[np.argsort(-scores[candidates])]:
+            if self._keys[slot] == key:
+                self._last_used[slot] = now
+                return self._values[slot]
+        return default
+
+    def set(self, vector, value: Any, key: Hashable = None):
+        """Cache a value under a query embedding."""
+        vector = self._normalize(vector)
+        if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+            self._vectors = np.zeros((self.maxsize, vector.shape[0]), dtype=np.float32)
+            self._size = 0
+
+        slot = self._find_duplicate(vector, key)
+        if slot is None:
+            if self._size < self.maxsize:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+
+        now = time.monotonic()
+        self._vectors[slot] = vector
+        self._keys[slot] = key
+        self._values[slot] = value
+        self._expires[slot] = now + self.ttl
+        self._last_used[slot] = now
+
+    def _find_duplicate(self, vector: np.ndarray, key: Hashable) -> Optional[int]:
+        """Slot of an entry (live or expired) this query would have matched, if any.
+
+        Refreshing that slot instead of taking a new one keeps near-duplicate
+        queries from filling the cache with copies of the same results.
+        """
+        if not self._size:
+            return None
+        scores = self._vectors[:self._size] @ vector
+        for slot in np.flatnonzero(scores >= self.threshold):
+            if self._keys[slot] == key:
+                return int(slot)
+        return None
+
+    def clear(self):
+        """Drop all cached entries."""
+        self._size = 0
+        self._keys = [None] * self.maxsize
+        self._values = [None] * self.maxsize
+
+    def __len__(self) -> int:
+        return self._size
+
+def make_etag(body: bytes) -> str:
+    """Compute a strong ETag for a response body."""
+    return f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check whether an If-None-Match header matches the given ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return etag in (tag.strip() for tag in if_none_match.split(','))
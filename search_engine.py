@@ -41,6 +41,34 @@ class SearchEngine:
         final_results = self._apply_final_filters(ranked_results, similarity_threshold)
         
         return final_results[:limit]
+
+    async def search_batch(self, queries: List[str], limits: List[int],
+                           similarity_thresholds: List[float]) -> List[List[Dict[str, Any]]]:
+        """Perform comprehensive search for several queries in one vector store round-trip."""
+        
+        # Preprocess queries
+        processed_queries = [self._preprocess_query(query) for query in queries]
+        
+        # Get vector similarity results for the whole batch
+        search_multiplier = self.config.get('search.initial_search_multiplier', 2)
+        threshold_multiplier = self.config.get('search.initial_threshold_multiplier', 0.8)
+        
+        batch_results = await self.vector_store.search_batch(
+            processed_queries,
+            limits=[limit * search_multiplier for limit in limits],
+            similarity_thresholds=[threshold * threshold_multiplier for threshold in similarity_thresholds]
+        )
+        
+        final_batch = []
+        for query, limit, threshold, vector_results in zip(queries, limits, similarity_thresholds, batch_results):
+            # Apply additional ranking factors
+            ranked_results = await self._rerank_results(vector_results, query)
+            
+            # Apply final filtering and limit
+            final_results = self._apply_final_filters(ranked_results, threshold)
+            final_batch.append(final_results[:limit])
+        
+        return final_batch
     
     def _preprocess_query(self, query: str) -> str:
         """Preprocess the search query for better results."""
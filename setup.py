@@ -10,7 +10,7 @@ build_options = {
     'packages': [
         'asyncio', 'uvicorn', 'fastapi', 'lancedb', 'sentence_transformers',
         'PyPDF2', 'fitz', 'docx', 'markdown', 'bs4', 'langchain', 'pandas',
-        'numpy', 'pyarrow', 'watchdog', 'aiofiles', 'multipart', 'psutil',
+        'numpy', 'pyarrow', 'watchdog', 'aiofiles', 'multipart', 'psutil', 'orjson',
         'pyperclip', 'keyboard', 'pyautogui', 'win32api', 'win32con', 'win32gui',
         'win32clipboard', 'tkinter', 'threading', 'json', 'pathlib', 'logging',
         'sqlite3', 'urllib', 'http', 'email', 'xml', 'html', 'winreg'
@@ -32,6 +32,51 @@ def signal_handler(signum, frame):
     logger.info(f"Received signal {signum}, shutting down...")
     sys.exit(0)
 
+def uvicorn_options():
+    """Build uvicorn settings for serving the API.
+
+    Uses uvloop and httptools when installed (uvicorn[standard] pulls them in
+    everywhere but Windows). Serves from a single worker: every worker builds
+    its own backend, so several would each index and watch the same folders,
+    write to the same LanceDB table and overwrite each other's citations.
+    A Redis task store only shares processing-task state, not any of that.
+    Worker counts from server.workers or WEB_CONCURRENCY are clamped to 1.
+    """
+    from config import Config
+
+    config = Config()
+    workers = config.get('server.workers', 1)
+    source = 'server.workers'
+    if os.environ.get('WEB_CONCURRENCY'):
+        workers = int(os.environ['WEB_CONCURRENCY'])
+        source = 'WEB_CONCURRENCY'
+    if workers > 1:
+        logger.warning(f"{source}={workers} ignored: indexing, folder monitoring and citations "
+                       f"are per-process, so the backend runs a single worker")
+        workers = 1
+
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+
+    return {
+        "host": config.get('server.host', "127.0.0.1"),
+        "port": config.get('server.port', 8000),
+        "loop": loop,
+        "http": http,
+        "workers": workers,
+        "log_level": "warning",
+        "access_log": False,
+    }
+
 def main():
     """Main entry point for the backend."""
     try:
@@ -45,14 +90,10 @@ def main():
         os.chdir(current_dir)
         
         # Start the FastAPI server
-        uvicorn.run(
-            "api_service:app",
-            host="127.0.0.1",
-            port=8000,
-            log_level="info",
-            access_log=True,
-            reload=False  # Disable reload in production
-        )
+        options = uvicorn_options()
+        logger.info(f"Serving on {options['host']}:{options['port']} with {options['workers']} worker(s), "
+                    f"loop={options['loop']}, http={options['http']}")
+        uvicorn.run("api_service:app", **options)
         
     except Exception as e:
         logger.error(f"Failed to start backend: {e}")
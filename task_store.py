@@ -0,0 +1,331 @@
+"""
+Task state storage for API background jobs (uploads, path processing, Readwise imports).
+Uses process memory by default, or Redis when configured so several API workers share state
+(and, through the Redis store, short-lived cached responses).
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Any, Optional
+
+import orjson
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Finished tasks stay readable for an hour by default (tasks.ttl_seconds) before eviction
+TASK_TTL_SECONDS = 3600
+TERMINAL_STATUSES = ('completed', 'error')
+RUNNING_TASKS_KEY = 'running_tasks'
+HEARTBEAT_INTERVAL = 30.0  # seconds between SSE keep-alives
+
+# KEYS: task hash, running set. ARGV: ttl, terminal flag, task_id, field/value pairs.
+# Updates an existing task atomically and returns its full hash (nil if unknown).
+UPDATE_TASK_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return nil
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 4))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+if ARGV[2] == '1' then
+    redis.call('SREM', KEYS[2], ARGV[3])
+end
+return redis.call('HGETALL', KEYS[1])
+"""
+
+def _json_default(value: Any) -> Any:
+    """Serialize objects that json cannot handle natively (e.g. DocumentChunk)."""
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    return str(value)
+
+def encode_update(update: Dict[str, Any]) -> bytes:
+    """Serialize a progress update once for all subscribers."""
+    return orjson.dumps(update, default=_json_default)
+
+class BroadcastChannel:
+    """Single-slot broadcast: one send wakes every waiting subscriber at once.
+
+    Subscribers always read the latest message, so a slow reader skips
+    intermediate progress updates but never the final status.
+    """
+
+    def __init__(self):
+        self.message: Optional[bytes] = None
+        self.final = False
+        self.version = 0
+        self.subscriber_count = 0
+        self._event = asyncio.Event()
+
+    def send(self, message: bytes, final: bool = False):
+        """Publish a pre-serialized message to all subscribers."""
+        self.message = message
+        self.final = final
+        self.version += 1
+        self._wake()
+
+    def heartbeat(self):
+        """Wake subscribers without a new message."""
+        self._wake()
+
+    def _wake(self):
+        event, self._event = self._event, asyncio.Event()
+        event.set()
+
+    async def wait(self, seen_version: int) -> int:
+        """Wait until a message newer than seen_version or a heartbeat arrives."""
+        if self.version == seen_version:
+            await self._event.wait()
+        return self.version
+
+class InMemorySubscription:
+    """Progress subscription reading from a task's broadcast channel."""
+
+    def __init__(self, store: 'InMemoryTaskStore', task_id: str, channel: BroadcastChannel):
+        self.store = store
+        self.task_id = task_id
+        self.channel = channel
+        self.version = channel.version
+        self.finished = False
+
+    async def get(self) -> Optional[bytes]:
+        """Wait for the next serialized update; returns None on a heartbeat tick."""
+        version = await self.channel.wait(self.version)
+        if version == self.version:
+            return None
+        self.version = version
+        self.finished = self.channel.final
+        return self.channel.message
+
+    async def close(self):
+        """Stop receiving updates."""
+        self.channel.subscriber_count -= 1
+        if self.channel.subscriber_count <= 0:
+            self.store.channels.pop(self.task_id, None)
+
+class InMemoryTaskStore:
+    """Task store kept in this process's memory (single worker only)."""
+
+    def __init__(self, ttl_seconds: int = TASK_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self.finished_at: Dict[str, float] = {}  # task_id -> monotonic time it reached a terminal status
+        self.channels: Dict[str, BroadcastChannel] = {}  # task_id -> channel for SSE
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    async def create(self, task_id: str, status: Dict[str, Any]):
+        """Store the initial status of a new task."""
+        self.tasks[task_id] = status
+
+    async def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get the current status of a task, or None if unknown."""
+        return self.tasks.get(task_id)
+
+    async def update(self, task_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """Update task fields and return the full status, or None if unknown."""
+        task = self.tasks.get(task_id)
+        if task is None:
+            return None
+        task.update(fields)
+        if fields.get('status') in TERMINAL_STATUSES:
+            self.finished_at[task_id] = time.monotonic()
+        return task
+
+    async def purge_finished(self, max_age: Optional[float] = None) -> int:
+        """Drop tasks that finished more than max_age seconds ago (default: the store TTL); returns how many."""
+        cutoff = time.monotonic() - (self.ttl_seconds if max_age is None else max_age)
+        expired = [task_id for task_id, finished in self.finished_at.items() if finished < cutoff]
+        for task_id in expired:
+            del self.finished_at[task_id]
+            self.tasks.pop(task_id, None)
+            channel = self.channels.get(task_id)
+            if channel is not None and channel.subscriber_count <= 0:
+                del self.channels[task_id]
+        return len(expired)
+
+    async def publish(self, task_id: str, update: Dict[str, Any]):
+        """Send a progress update to all subscribers of a task."""
+        channel = self.channels.get(task_id)
+        if channel is not None:
+            channel.send(encode_update(update), update.get('status') in TERMINAL_STATUSES)
+
+    async def subscribe(self, task_id: str) -> InMemorySubscription:
+        """Subscribe to progress updates for a task."""
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_ticker())
+
+        channel = self.channels.get(task_id)
+        if channel is None:
+            channel = self.channels[task_id] = BroadcastChannel()
+        channel.subscriber_count += 1
+        return InMemorySubscription(self, task_id, channel)
+
+    async def _heartbeat_ticker(self):
+        """Wake every open subscription once per heartbeat interval."""
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            for channel in list(self.channels.values()):
+                channel.heartbeat()
+
+    async def get_cached(self, key: str) -> Optional[bytes]:
+        """Shared response cache; a single process keeps its own caches, so always a miss."""
+        return None
+
+    async def set_cached(self, key: str, value: bytes, ttl_seconds: float):
+        """Shared response cache; nothing to share within a single process."""
+
+    async def delete_cached(self, key: str):
+        """Shared response cache; nothing to invalidate within a single process."""
+
+    async def close(self):
+        """Release resources held by the store."""
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+
+class RedisSubscription:
+    """Progress subscription backed by Redis Pub/Sub."""
+
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+        self.finished = False
+
+    async def get(self) -> Optional[bytes]:
+        """Wait for the next serialized update; returns None after a heartbeat interval without one."""
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=HEARTBEAT_INTERVAL)
+        if message is None:
+            return None
+        payload = message['data'].encode()
+        self.finished = orjson.loads(payload).get('status') in TERMINAL_STATUSES
+        return payload
+
+    async def close(self):
+        """Stop receiving updates."""
+        try:
+            await self.pubsub.unsubscribe()
+            await self.pubsub.aclose()
+        except Exception as e:
+            logger.debug(f"Error closing Redis subscription: {e}")
+
+class RedisTaskStore:
+    """Task store shared across API workers through Redis.
+
+    Each task is a hash at ``task:{task_id}`` with JSON-encoded field values,
+    running task IDs are kept in a set, and progress updates are published on
+    ``task_progress:{task_id}``.
+    """
+
+    def __init__(self, redis_url: str, ttl_seconds: int = TASK_TTL_SECONDS):
+        self.redis = aioredis.from_url(redis_url, decode_responses=True)
+        self.ttl_seconds = ttl_seconds
+        self._update_script = self.redis.register_script(UPDATE_TASK_SCRIPT)
+
+    @staticmethod
+    def _key(task_id: str) -> str:
+        return f"task:{task_id}"
+
+    @staticmethod
+    def _channel(task_id: str) -> str:
+        return f"task_progress:{task_id}"
+
+    @staticmethod
+    def _encode(fields: Dict[str, Any]) -> Dict[str, str]:
+        return {key: json.dumps(value, default=_json_default) for key, value in fields.items()}
+
+    @staticmethod
+    def _decode(data: Dict[str, str]) -> Dict[str, Any]:
+        return {key: json.loads(value) for key, value in data.items()}
+
+    async def create(self, task_id: str, status: Dict[str, Any]):
+        """Store the initial status of a new task."""
+        key = self._key(task_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=self._encode(status))
+            pipe.expire(key, self.ttl_seconds)
+            pipe.sadd(RUNNING_TASKS_KEY, task_id)
+            await pipe.execute()
+
+    async def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get the current status of a task, or None if unknown."""
+        data = await self.redis.hgetall(self._key(task_id))
+        return self._decode(data) if data else None
+
+    async def update(self, task_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """Update task fields and return the full status, or None if unknown.
+
+        Runs as one server-side script, so each progress tick costs a single
+        round trip instead of an EXISTS check followed by a pipeline.
+        """
+        encoded = self._encode(fields)
+        terminal = '1' if fields.get('status') in TERMINAL_STATUSES else '0'
+        args = [self.ttl_seconds, terminal, task_id]
+        for field, value in encoded.items():
+            args.extend((field, value))
+
+        flat = await self._update_script(keys=[self._key(task_id), RUNNING_TASKS_KEY], args=args)
+        if not flat:
+            return None
+        return self._decode(dict(zip(flat[::2], flat[1::2])))
+
+    async def purge_finished(self, max_age: Optional[float] = None) -> int:
+        """Finished tasks expire through their Redis TTL; nothing to purge here."""
+        return 0
+
+    async def publish(self, task_id: str, update: Dict[str, Any]):
+        """Send a progress update to all subscribers of a task."""
+        try:
+            await self.redis.publish(self._channel(task_id), encode_update(update))
+        except Exception as e:
+            logger.error(f"Failed to notify subscribers: {e}")
+
+    async def subscribe(self, task_id: str) -> RedisSubscription:
+        """Subscribe to progress updates for a task."""
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(self._channel(task_id))
+        return RedisSubscription(pubsub)
+
+    @staticmethod
+    def _cache_key(key: str) -> str:
+        return f"cache:{key}"
+
+    async def get_cached(self, key: str) -> Optional[bytes]:
+        """Get a response body cached by any worker, or None."""
+        try:
+            value = await self.redis.get(self._cache_key(key))
+        except Exception as e:
+            logger.warning(f"Shared cache read failed: {e}")
+            return None
+        return value.encode() if value is not None else None
+
+    async def set_cached(self, key: str, value: bytes, ttl_seconds: float):
+        """Cache a response body for all workers for ttl_seconds."""
+        try:
+            await self.redis.set(self._cache_key(key), value, px=int(ttl_seconds * 1000))
+        except Exception as e:
+            logger.warning(f"Shared cache write failed: {e}")
+
+    async def delete_cached(self, key: str):
+        """Invalidate a shared cached response."""
+        try:
+            await self.redis.delete(self._cache_key(key))
+        except Exception as e:
+            logger.warning(f"Shared cache delete failed: {e}")
+
+    async def close(self):
+        """Release resources held by the store."""
+        await self.redis.aclose()
+
+def create_task_store(redis_url: Optional[str] = None, ttl_seconds: int = TASK_TTL_SECONDS):
+    """Create a Redis-backed store when a URL is configured, else an in-memory one."""
+    if redis_url:
+        if REDIS_AVAILABLE:
+            logger.info(f"Using Redis task store: {redis_url}")
+            return RedisTaskStore(redis_url, ttl_seconds)
+        logger.warning("Redis task store configured but redis is not installed, using in-memory store")
+    return InMemoryTaskStore(ttl_seconds)